@@ -0,0 +1,137 @@
+"""Throughput of ModelPool over stub Ollama servers against a single backend.
+
+Starts --backends stub servers speaking Ollama's /api/chat, each answering
+one request at a time like a CPU-only Ollama, and sends --requests chat
+requests through LiteLLM, --concurrency at a time, first to one server and
+then through a pool of all of them. With --fail-backend one server answers
+every chat request with HTTP 500, which the pool has to route around.
+
+    python benchmarks/bench_model_pool.py [--backends 3] [--requests 60] [--concurrency 12] [--fail-backend]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from aiohttp import web  # noqa: E402
+from google.adk.models.lite_llm import LiteLlm  # noqa: E402
+from google.adk.models.llm_request import LlmRequest  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from agent.model_pool import ModelPool  # noqa: E402
+
+MODEL = "ollama_chat/gemma3:1b"
+
+
+def stub_ollama(seconds_per_request, failing=False):
+    """aiohttp app answering /api/chat one request at a time."""
+    busy = asyncio.Lock()
+
+    async def chat(request):
+        body = await request.json()
+        if failing:
+            return web.json_response({"error": "model crashed"}, status=500)
+        async with busy:
+            await asyncio.sleep(seconds_per_request)
+        message = {"role": "assistant", "content": "the path is pe-1 -> p-2 -> cpe-3"}
+        chunk = {"model": body["model"], "message": message, "done": True, "prompt_eval_count": 10, "eval_count": 8}
+        if not body.get("stream"):
+            return web.json_response(chunk)
+        response = web.StreamResponse()
+        await response.prepare(request)
+        await response.write((json.dumps({**chunk, "done": False}) + "\n").encode())
+        await response.write((json.dumps({**chunk, "message": {**message, "content": ""}}) + "\n").encode())
+        return response
+
+    async def show(request):
+        return web.json_response({})
+
+    async def health(request):
+        return web.Response(text="Ollama is running")
+
+    app = web.Application()
+    app.router.add_post("/api/chat", chat)
+    app.router.add_post("/api/show", show)
+    app.router.add_get("/", health)
+    return app
+
+
+def start_stubs(count, seconds_per_request, fail_backend):
+    """Run the stub servers on their own loop, since LiteLLM makes blocking calls to them."""
+    bases = []
+    ready = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        for i in range(count):
+            runner = web.AppRunner(stub_ollama(seconds_per_request, failing=fail_backend and i == count - 1))
+            loop.run_until_complete(runner.setup())
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            loop.run_until_complete(site.start())
+            bases.append(f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}")
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    ready.wait()
+    return bases
+
+
+async def drive(model, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one(i):
+        nonlocal errors
+        request = LlmRequest(model=MODEL, contents=[
+            types.Content(role="user", parts=[types.Part(text=f"show me the path from pe-1 to cpe-{i % 5}")])
+        ])
+        async with semaphore:
+            try:
+                async for _ in model.generate_content_async(request, stream=True):
+                    pass
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start, errors
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--concurrency", type=int, default=12)
+    parser.add_argument("--seconds-per-request", type=float, default=0.05)
+    parser.add_argument("--fail-backend", action="store_true")
+    args = parser.parse_args()
+
+    bases = start_stubs(args.backends, args.seconds_per_request, args.fail_backend)
+
+    single = LiteLlm(model=MODEL, api_base=bases[0])
+    # The first request pays for LiteLLM's lazy imports
+    await drive(single, 1, 1)
+    seconds, errors = await drive(single, args.requests, args.concurrency)
+    print(f"single backend: {args.requests / seconds:6.1f} requests/s  ({errors} errors)")
+
+    pool = ModelPool.from_api_bases(MODEL, bases, health_interval_seconds=1.0)
+    seconds, errors = await drive(pool, args.requests, args.concurrency)
+    print(f"pool of {args.backends}:     {args.requests / seconds:6.1f} requests/s  ({errors} errors)")
+    stats = pool.get_pool_stats()
+    await pool.close()
+    print(f"retries {stats['retries']}, affinity routed {stats['affinity_routed']} of {stats['requests']}")
+    for name, backend in stats["backends"].items():
+        print(f"  {name}: {backend['requests']:4} requests, {backend['failures']} failures, circuit {backend['circuit']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
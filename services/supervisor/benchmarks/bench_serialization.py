@@ -0,0 +1,99 @@
+"""Microbenchmark for the outbound AG-UI event serialization path.
+
+Compares the original emit path (model_dump + stdlib json + INFO payload
+logging) with EventSerializer + the fast json module + sampled tracing.
+
+    python benchmarks/bench_serialization.py [--events 200000]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from ag_ui.core import (  # noqa: E402
+    EventType,
+    TextMessageContentEvent,
+    TextMessageStartEvent,
+    TextMessageEndEvent,
+    ToolCallArgsEvent,
+)
+
+from endpoints.serialization import EventSerializer, PayloadTracer, json_module  # noqa: E402
+
+
+def make_events(count):
+    message_id = str(uuid.uuid4())
+    events = [TextMessageStartEvent(type=EventType.TEXT_MESSAGE_START, message_id=message_id, role="assistant")]
+    for i in range(count - 3):
+        events.append(TextMessageContentEvent(
+            type=EventType.TEXT_MESSAGE_CONTENT,
+            message_id=message_id,
+            delta=f"token{i} "
+        ))
+    events.append(ToolCallArgsEvent(
+        type=EventType.TOOL_CALL_ARGS,
+        tool_call_id="call_1",
+        delta=json.dumps({"task": "show me the path from pe-1 to cpe-3"})
+    ))
+    events.append(TextMessageEndEvent(type=EventType.TEXT_MESSAGE_END, message_id=message_id))
+    return events
+
+
+def make_logger(name):
+    log = logging.getLogger(name)
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+    return log
+
+
+def run_baseline(events):
+    log = make_logger("bench.baseline")
+    start = time.perf_counter()
+    for event in events:
+        event_data = event.model_dump(mode='json', by_alias=True)
+        log.info("Emitting ag-ui event: %s", event_data)
+        json.dumps(["agui_event", event_data], separators=(',', ':'))
+    return time.perf_counter() - start
+
+
+def run_fast_path(events):
+    log = make_logger("bench.fast")
+    serializer = EventSerializer()
+    tracer = PayloadTracer(log)
+    start = time.perf_counter()
+    for event in events:
+        event_data = serializer.to_dict(event)
+        tracer.trace("sid", event_data)
+        json_module.dumps(["agui_event", event_data], separators=(',', ':'))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+
+    # Sanity check: both paths must produce the same payloads
+    serializer = EventSerializer()
+    for event in events[:3] + events[-2:]:
+        assert serializer.to_dict(event) == event.model_dump(mode='json', by_alias=True)
+
+    baseline = run_baseline(events)
+    fast = run_fast_path(events)
+
+    print(f"json module: {json_module.__name__}")
+    print(f"baseline : {len(events) / baseline:>12,.0f} events/s")
+    print(f"fast path: {len(events) / fast:>12,.0f} events/s  ({baseline / fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
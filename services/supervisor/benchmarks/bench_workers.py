@@ -0,0 +1,122 @@
+"""Throughput of the supervisor with 1, 2, 4... worker processes on one node.
+
+For each worker count, starts that many supervisor workers the way main.py
+does with SUPERVISOR_WORKERS (processes sharing the port through
+SO_REUSEPORT, each building its own Socket.IO server after the fork), with
+the chat agent on FakeLlm, and drives --clients simulated clients from
+--client-processes processes so the load generator isn't the bottleneck.
+Runs are CPU bound by default (--rate 0 streams tokens without waiting), so
+throughput should grow with the worker count up to the number of cores.
+
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--clients 32] [--messages 5] [--tokens 200]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_llm import FakeLlm  # noqa: E402
+from loadtest import SimulatedClient, percentile  # noqa: E402
+
+
+def serve(port, args, ready):
+    """One worker process, as main.run_worker builds it."""
+    import logging
+    import main
+    from agent.base_agent import build_agent
+
+    logging.getLogger().setLevel(logging.ERROR)
+    model = FakeLlm(response_tokens=args.tokens, tokens_per_second=args.rate)
+    main.create_endpoint(build_agent(model), max_concurrent_executions=args.clients)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(main.init(reuse_port=True, port=port))
+    ready.set()
+    loop.run_forever()
+
+
+def drive(url, clients, messages, results):
+    """One load generator process; reports (runs, tokens, errors, latencies)."""
+    async def run():
+        simulated = [SimulatedClient(url, messages) for _ in range(clients)]
+        await asyncio.gather(*(client.run() for client in simulated))
+        return simulated
+
+    simulated = asyncio.run(run())
+    results.put((
+        sum(len(client.latency) for client in simulated),
+        sum(client.tokens for client in simulated),
+        sum(client.errors for client in simulated),
+        [value for client in simulated for value in client.latency]
+    ))
+
+
+def measure(workers, args):
+    """Run the load against `workers` worker processes; returns (runs, tokens, errors, latencies, seconds)."""
+    ctx = multiprocessing.get_context("fork")
+    ready = [ctx.Event() for _ in range(workers)]
+    servers = [ctx.Process(target=serve, args=(args.port, args, event), daemon=True) for event in ready]
+    for server in servers:
+        server.start()
+    for event in ready:
+        event.wait()
+
+    results = ctx.Queue()
+    url = f"http://127.0.0.1:{args.port}"
+    shares = [args.clients // args.client_processes + (i < args.clients % args.client_processes)
+              for i in range(args.client_processes)]
+    drivers = [ctx.Process(target=drive, args=(url, share, args.messages, results)) for share in shares if share]
+    started = time.perf_counter()
+    for driver in drivers:
+        driver.start()
+    totals = [results.get() for _ in drivers]
+    elapsed = time.perf_counter() - started
+    for driver in drivers:
+        driver.join()
+
+    for server in servers:
+        server.terminate()
+        server.join()
+    return (
+        sum(t[0] for t in totals),
+        sum(t[1] for t in totals),
+        sum(t[2] for t in totals),
+        [value for t in totals for value in t[3]],
+        elapsed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--messages", type=int, default=5, help="runs per client")
+    parser.add_argument("--tokens", type=int, default=200, help="tokens per response")
+    parser.add_argument("--rate", type=float, default=0.0, help="tokens per second per run (0 = no waiting)")
+    parser.add_argument("--client-processes", type=int, default=None,
+                        help="load generator processes (defaults to the largest worker count)")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.workers.split(",")]
+    args.client_processes = args.client_processes or max(counts)
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients x {args.messages} runs of {args.tokens} tokens")
+
+    baseline = None
+    for workers in counts:
+        runs, tokens, errors, latency, seconds = measure(workers, args)
+        throughput = runs / seconds
+        baseline = baseline or throughput
+        print(f"{workers} workers: {throughput:7.1f} runs/s  {tokens / seconds:9,.0f} tokens/s  "
+              f"p50 {percentile(latency, 50) * 1000:7.1f} ms  x{throughput / baseline:.2f}  ({errors} errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Deterministic stand-in for the chat model, for offline benchmarks.
+
+FakeLlm streams a fixed number of tokens at a configurable rate and can
+call a tool a configurable number of times, several per turn if asked,
+before answering, so a run exercises the same ADK and middleware paths
+as a real model without Ollama or network access.
+"""
+
+import asyncio
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+
+class FakeLlm(BaseLlm):
+    """Model that streams `response_tokens` tokens at `tokens_per_second`."""
+
+    model: str = "fake-llm"
+    response_tokens: int = 50
+    tokens_per_second: float = 200.0
+    tool_calls: int = 0
+    tool_calls_per_turn: int = 1
+    tool_name: str = "runtask"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        # Tool results received since the last user turn decide what comes next
+        answered = 0
+        for content in reversed(llm_request.contents or []):
+            parts = content.parts or []
+            if any(part.function_response for part in parts):
+                answered += sum(1 for part in parts if part.function_response)
+            elif content.role == "user":
+                break
+
+        if answered < self.tool_calls:
+            count = min(max(self.tool_calls_per_turn, 1), self.tool_calls - answered)
+            yield LlmResponse(
+                content=types.Content(role="model", parts=[
+                    types.Part(function_call=types.FunctionCall(
+                        name=self.tool_name,
+                        args={"task": f"benchmark task {answered + i + 1}"}
+                    ))
+                    for i in range(count)
+                ]),
+                partial=False,
+                turn_complete=True,
+                usage_metadata=self._usage(llm_request, count)
+            )
+            return
+
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        tokens = []
+        for i in range(self.response_tokens):
+            if delay:
+                await asyncio.sleep(delay)
+            token = f"token{i} "
+            tokens.append(token)
+            if stream:
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=token)]),
+                    partial=True
+                )
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="".join(tokens))]),
+            partial=False,
+            turn_complete=True,
+            usage_metadata=self._usage(llm_request, len(tokens))
+        )
+
+    @staticmethod
+    def _usage(llm_request: LlmRequest, output_tokens: int) -> types.GenerateContentResponseUsageMetadata:
+        """Token counts as a real model would report them (one token per word)."""
+        prompt_tokens = sum(
+            len((part.text or "").split())
+            for content in llm_request.contents or []
+            for part in content.parts or []
+        )
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens
+        )
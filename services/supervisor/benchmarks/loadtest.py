@@ -0,0 +1,217 @@
+"""Load test for the supervisor Socket.IO endpoint, fully offline.
+
+Starts the aiohttp/Socket.IO app from main.py on its own event loop in a
+background thread, with the chat agent running on FakeLlm, then drives N
+simulated Socket.IO clients that each send `user_message` events one run
+at a time. Reports time to first token, token throughput, run latency,
+memory growth and the server event loop's lag.
+
+    python benchmarks/loadtest.py --clients 20 --messages 5 --tokens 100 --rate 200 --tool-calls 1
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import socketio  # noqa: E402
+
+from fake_llm import FakeLlm  # noqa: E402
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def rss_mb():
+    """Current resident set size, falling back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LoopLagMonitor:
+    """Measures how late a periodic timer fires on the event loop it runs on."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.samples = []
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected))
+
+
+class ServerThread(threading.Thread):
+    """Runs main.py's app on a private event loop, like a worker process would."""
+
+    def __init__(self, port, model, max_concurrent):
+        super().__init__(daemon=True, name="supervisor")
+        self.port = port
+        self.model = model
+        self.max_concurrent = max_concurrent
+        self.ready = threading.Event()
+        self.lag = LoopLagMonitor()
+        self.loop = None
+        self.endpoint = None
+
+    def run(self):
+        import main
+        from agent.base_agent import build_agent
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.endpoint = main.create_endpoint(
+            build_agent(self.model),
+            max_concurrent_executions=self.max_concurrent
+        )
+        self.loop.run_until_complete(main.init(port=self.port))
+        self.lag.start()
+        self.ready.set()
+        self.loop.run_forever()
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.lag.stop)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class SimulatedClient:
+    """One chat client sending messages sequentially and timing each run."""
+
+    def __init__(self, url, messages):
+        self.url = url
+        self.messages = messages
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.ttft = []
+        self.latency = []
+        self.tokens = 0
+        self.errors = 0
+        self._first_token = None
+        self._run_tokens = 0
+        self._done = asyncio.Event()
+        self.sio.on("agui_event", self._on_event)
+
+    async def _on_event(self, data):
+        event_type = data.get("type")
+        if event_type == "TEXT_MESSAGE_CONTENT":
+            if self._first_token is None:
+                self._first_token = time.perf_counter()
+            self._run_tokens += len(data.get("delta", "").split())
+        elif event_type in ("RUN_FINISHED", "RUN_ERROR"):
+            if event_type == "RUN_ERROR":
+                self.errors += 1
+            self._done.set()
+        elif event_type == "CUSTOM" and data.get("name") == "error":
+            self.errors += 1
+            self._done.set()
+
+    async def run(self):
+        await self.sio.connect(self.url, transports=["websocket"])
+        try:
+            for i in range(self.messages):
+                self._done.clear()
+                self._first_token = None
+                self._run_tokens = 0
+                started = time.perf_counter()
+                await self.sio.emit("agui_event", {
+                    "name": "user_message",
+                    "value": {"content": f"run benchmark task {i}"}
+                })
+                await self._done.wait()
+                finished = time.perf_counter()
+                self.latency.append(finished - started)
+                if self._first_token is not None:
+                    self.ttft.append(self._first_token - started)
+                self.tokens += self._run_tokens
+        finally:
+            await self.sio.disconnect()
+
+
+async def drive(args):
+    url = f"http://127.0.0.1:{args.port}"
+    clients = [SimulatedClient(url, args.messages) for _ in range(args.clients)]
+    started = time.perf_counter()
+    await asyncio.gather(*(client.run() for client in clients))
+    return clients, time.perf_counter() - started
+
+
+def report(clients, elapsed, lag, rss_before, rss_after):
+    ttft = [value for client in clients for value in client.ttft]
+    latency = [value for client in clients for value in client.latency]
+    tokens = sum(client.tokens for client in clients)
+    errors = sum(client.errors for client in clients)
+
+    def ms(value):
+        return f"{value * 1000:8.1f} ms"
+
+    print(f"runs            : {len(latency)} ({errors} errors) in {elapsed:.2f}s")
+    print(f"throughput      : {tokens / elapsed:,.0f} tokens/s, {len(latency) / elapsed:.1f} runs/s")
+    print(f"ttft p50 / p99  : {ms(percentile(ttft, 50))} / {ms(percentile(ttft, 99))}")
+    print(f"latency p50/p99 : {ms(percentile(latency, 50))} / {ms(percentile(latency, 99))}")
+    print(f"loop lag p50/p99: {ms(percentile(lag, 50))} / {ms(percentile(lag, 99))} (max {ms(max(lag, default=0))})")
+    print(f"memory (rss)    : {rss_before:.1f} MB -> {rss_after:.1f} MB ({rss_after - rss_before:+.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--messages", type=int, default=3, help="runs per client")
+    parser.add_argument("--tokens", type=int, default=100, help="tokens per response")
+    parser.add_argument("--rate", type=float, default=200.0, help="tokens per second per run")
+    parser.add_argument("--tool-calls", type=int, default=0, help="tool calls before each answer")
+    parser.add_argument("--tool-calls-per-turn", type=int, default=1, help="tool calls the model makes at once")
+    parser.add_argument("--max-concurrent", type=int, default=None,
+                        help="ADKAgent max_concurrent_executions (defaults to --clients)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    model = FakeLlm(
+        response_tokens=args.tokens,
+        tokens_per_second=args.rate,
+        tool_calls=args.tool_calls,
+        tool_calls_per_turn=args.tool_calls_per_turn
+    )
+    server = ServerThread(args.port, model, args.max_concurrent or args.clients)
+    server.start()
+    server.ready.wait()
+    logging.getLogger().setLevel(args.log_level)
+
+    gc.collect()
+    rss_before = rss_mb()
+    clients, elapsed = asyncio.run(drive(args))
+    gc.collect()
+    rss_after = rss_mb()
+    server.stop()
+
+    report(clients, elapsed, list(server.lag.samples), rss_before, rss_after)
+
+
+if __name__ == "__main__":
+    main()
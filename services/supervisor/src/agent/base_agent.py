@@ -1,16 +1,46 @@
+import os
+
 from google.adk.agents import Agent
 from google.adk.models.lite_llm import LiteLlm
+from agent.caching_llm import CachingLlm
+from agent.model_pool import ModelPool
 from tools.agui import taskApproval
 from tools.tasks import runtask
 
+MODEL = "ollama_chat/gemma3:1b"
+# Comma separated Ollama instances to spread requests over, e.g.
+# http://ollama-1:11434,http://ollama-2:11434 (unset = LiteLLM's default endpoint)
+OLLAMA_API_BASES = os.getenv("OLLAMA_API_BASES")
+# Seconds to reuse answers to repeated prompts (unset = every prompt goes to the model)
+LLM_CACHE_TTL = os.getenv("LLM_CACHE_TTL")
+# Similarity (0-1) at which a reworded question reuses a cached answer (unset = exact match only)
+LLM_CACHE_SEMANTIC_THRESHOLD = os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD")
+
+
+def build_agent(model=None) -> Agent:
+    """Create the chat agent around a model (the local Ollama model by default)."""
+    if model is None:
+        if OLLAMA_API_BASES:
+            model = ModelPool.from_api_bases(MODEL, [base.strip() for base in OLLAMA_API_BASES.split(",") if base.strip()])
+        else:
+            model = LiteLlm(model=MODEL)
+    if LLM_CACHE_TTL:
+        # runtask has side effects, so no tool of this agent is read-only
+        model = CachingLlm(
+            model,
+            ttl_seconds=float(LLM_CACHE_TTL),
+            semantic_threshold=float(LLM_CACHE_SEMANTIC_THRESHOLD) if LLM_CACHE_SEMANTIC_THRESHOLD else None
+        )
+    return Agent(
+        name="ChatAgent",
+        model=model,
+        instruction="""You are a helpful assistant that executes user tasks. Use your tools 
+        to implement tasks and also ensure the user approves all tasks before your execute them.
+        """,
+        tools=[runtask]
+    )
+
+
 # Create a basic agent - you can customize this based on your needs
 # This is a simple example agent that can respond to messages
-basic_agent = Agent(
-    name="ChatAgent",
-    model=LiteLlm(model="ollama_chat/gemma3:1b"),
-    instruction="""You are a helpful assistant that executes user tasks. Use your tools 
-    to implement tasks and also ensure the user approves all tasks before your execute them.
-    """,
-    tools=[runtask]
-)
-
+basic_agent = build_agent()
@@ -0,0 +1,293 @@
+# src/agent/caching_llm.py
+
+"""Response cache in front of a model, for prompts that are asked over and over."""
+
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, FrozenSet, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import re
+import time
+
+from pydantic import PrivateAttr
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_WORDS = re.compile(r"[a-z0-9]+(?:[-_./:][a-z0-9]+)*")
+_CHUNKS = re.compile(r"\S+\s*|\s+")
+
+
+def _normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip().lower()
+
+
+def _normalize_content(content: types.Content) -> List[Any]:
+    """Role and parts of a content with whitespace, case and key order normalized."""
+    parts = []
+    for part in content.parts or []:
+        if part.thought:
+            continue
+        if part.text is not None:
+            parts.append(["text", _normalize_text(part.text)])
+        elif part.function_call:
+            parts.append(["call", part.function_call.name, part.function_call.args or {}])
+        elif part.function_response:
+            parts.append(["response", part.function_response.name, part.function_response.response or {}])
+        else:
+            parts.append(["other", part.model_dump(mode="json", exclude_none=True)])
+    return [content.role, parts]
+
+
+def _words(text: str) -> FrozenSet[str]:
+    return frozenset(_WORDS.findall(text.lower()))
+
+
+class _CacheEntry:
+    __slots__ = ("responses", "expires_at", "prefix", "words")
+
+    def __init__(self, responses: List[LlmResponse], expires_at: float, prefix: str, words: Optional[FrozenSet[str]]):
+        self.responses = responses
+        self.expires_at = expires_at
+        self.prefix = prefix
+        self.words = words
+
+
+class CachingLlm(BaseLlm):
+    """Model wrapper that answers repeated prompts from a cache.
+
+    The cache key is a hash of the system instruction, tool declarations and
+    generation settings plus the last ``context_contents`` contents of the
+    conversation, after normalizing whitespace, case and JSON key order.
+    Entries expire ``ttl_seconds`` after they were stored and the least
+    recently used entry is evicted beyond ``max_entries``.
+
+    Only turns that can safely be replayed are cached: a response calling a
+    tool outside ``read_only_tools`` is never stored, and a request carrying
+    the result of such a call bypasses the cache, so tasks with side effects
+    always go through the model.
+
+    With ``semantic_threshold`` set, a miss on a user question falls back to
+    the cached question with the same context whose word sets are most alike
+    (Jaccard similarity at least the threshold). Words containing digits,
+    such as device names, have to match exactly.
+
+    Hits are replayed as the model would have streamed them, so clients see
+    the same events either way.
+
+    Args:
+        llm: The model that answers cache misses
+        ttl_seconds: How long a response stays cached
+        max_entries: Maximum number of cached responses
+        context_contents: Number of trailing conversation contents in the key
+        read_only_tools: Tools whose calls can be replayed from the cache
+        semantic_threshold: Minimum similarity for a near-duplicate hit (None = exact only)
+        replay_chunk_words: Words per partial response when replaying a stream
+    """
+
+    llm: BaseLlm
+    ttl_seconds: float = 600.0
+    max_entries: int = 1024
+    context_contents: int = 4
+    read_only_tools: FrozenSet[str] = frozenset()
+    semantic_threshold: Optional[float] = None
+    replay_chunk_words: int = 1
+
+    _entries: "OrderedDict[str, _CacheEntry]" = PrivateAttr(default_factory=OrderedDict)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {
+        "hits": 0,
+        "semantic_hits": 0,
+        "misses": 0,
+        "bypassed": 0,
+        "stored": 0,
+        "not_stored": 0,
+        "expired": 0,
+        "evicted": 0
+    })
+
+    def __init__(self, llm: BaseLlm, **kwargs):
+        kwargs.setdefault("model", llm.model)
+        super().__init__(llm=llm, **kwargs)
+
+    @property
+    def capabilities(self):
+        return self.llm.capabilities
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self._bypass(llm_request):
+            self._stats["bypassed"] += 1
+            async for response in self.llm.generate_content_async(llm_request, stream):
+                yield response
+            return
+
+        key, prefix, question = self._cache_key(llm_request)
+        entry = self._lookup(key, prefix, question)
+        if entry is not None:
+            logger.debug(f"Answering {self.model} request from the response cache")
+            for response in self._replay(entry.responses, stream):
+                yield response
+            return
+
+        self._stats["misses"] += 1
+        responses = []
+        cacheable = True
+        async for response in self.llm.generate_content_async(llm_request, stream):
+            if not response.partial:
+                if response.error_code or response.content is None:
+                    cacheable = False
+                responses.append(response)
+            yield response
+
+        if cacheable and responses and all(self._replayable(response) for response in responses):
+            self._store(key, prefix, question, responses)
+        else:
+            self._stats["not_stored"] += 1
+
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Cache hit, miss and eviction counters.
+
+        Returns:
+            Dictionary with the counters, the entry count and the hit rate
+        """
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0
+        }
+
+    def _bypass(self, llm_request: LlmRequest) -> bool:
+        """Whether the request follows a tool call that isn't read-only."""
+        for content in (llm_request.contents or [])[-self.context_contents:]:
+            for part in content.parts or []:
+                if part.function_response and part.function_response.name not in self.read_only_tools:
+                    return True
+        return False
+
+    def _replayable(self, response: LlmResponse) -> bool:
+        """Whether a response only calls read-only tools."""
+        return all(
+            part.function_call.name in self.read_only_tools
+            for part in (response.content.parts or [])
+            if part.function_call
+        )
+
+    def _cache_key(self, llm_request: LlmRequest) -> Tuple[str, str, Optional[FrozenSet[str]]]:
+        """Exact key, key without the latest user text, and that text's words.
+
+        The words are only returned for semantic lookups of a plain user question.
+        """
+        config = llm_request.config.model_dump(
+            mode="json", exclude_none=True, exclude={"http_options", "labels"}
+        ) if llm_request.config else {}
+        instruction = config.pop("system_instruction", None)
+        if isinstance(instruction, str):
+            instruction = _normalize_text(instruction)
+
+        contents = [_normalize_content(content) for content in (llm_request.contents or [])[-self.context_contents:]]
+        question = None
+        last = contents[-1] if contents else None
+        if last and last[0] == "user" and len(last[1]) == 1 and last[1][0][0] == "text":
+            question = last[1][0][1]
+            contents = contents[:-1]
+
+        prefix = self._hash([llm_request.model or self.model, instruction, config, contents])
+        key = self._hash([prefix, question])
+        words = _words(question) if question is not None and self.semantic_threshold is not None else None
+        return key, prefix, words
+
+    @staticmethod
+    def _hash(value: Any) -> str:
+        encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str, prefix: str, words: Optional[FrozenSet[str]]) -> Optional[_CacheEntry]:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= now:
+            self._drop(key, "expired")
+            entry = None
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry
+
+        if words is None:
+            return None
+        best_key, best_score = None, self.semantic_threshold
+        for candidate_key, candidate in list(self._entries.items()):
+            if candidate.expires_at <= now:
+                self._drop(candidate_key, "expired")
+                continue
+            if candidate.prefix != prefix or candidate.words is None:
+                continue
+            score = self._similarity(words, candidate.words)
+            if score >= best_score:
+                best_key, best_score = candidate_key, score
+        if best_key is None:
+            return None
+        self._entries.move_to_end(best_key)
+        self._stats["hits"] += 1
+        self._stats["semantic_hits"] += 1
+        return self._entries[best_key]
+
+    @staticmethod
+    def _similarity(words: FrozenSet[str], other: FrozenSet[str]) -> float:
+        # Identifiers like pe-1 or cpe-3 change the answer, so they must agree exactly
+        if {w for w in words if any(c.isdigit() for c in w)} != {w for w in other if any(c.isdigit() for c in w)}:
+            return 0.0
+        union = words | other
+        return len(words & other) / len(union) if union else 1.0
+
+    def _store(self, key: str, prefix: str, words: Optional[FrozenSet[str]], responses: List[LlmResponse]) -> None:
+        stored = []
+        for response in responses:
+            response = response.model_copy(deep=True)
+            # ADK assigns fresh ids to calls without one, so replays never reuse a call id
+            for part in response.content.parts or []:
+                if part.function_call:
+                    part.function_call.id = None
+            stored.append(response)
+
+        self._entries[key] = _CacheEntry(stored, time.monotonic() + self.ttl_seconds, prefix, words)
+        self._entries.move_to_end(key)
+        self._stats["stored"] += 1
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)), "evicted")
+
+    def _drop(self, key: str, reason: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self._stats[reason] += 1
+
+    def _replay(self, responses: List[LlmResponse], stream: bool):
+        """Cached final responses, preceded by partial text chunks when streaming."""
+        for response in responses:
+            response = response.model_copy(deep=True)
+            if stream:
+                for part in response.content.parts or []:
+                    if part.text and not part.thought:
+                        chunks = _CHUNKS.findall(part.text)
+                        size = max(self.replay_chunk_words, 1)
+                        for i in range(0, len(chunks), size):
+                            yield LlmResponse(
+                                content=types.Content(
+                                    role=response.content.role,
+                                    parts=[types.Part(text="".join(chunks[i:i + size]))]
+                                ),
+                                partial=True
+                            )
+            yield response
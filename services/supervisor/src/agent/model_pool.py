@@ -0,0 +1,260 @@
+# src/agent/model_pool.py
+
+"""Pool of model backends behind one ADK model, routed to the least loaded one."""
+
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+import aiohttp
+from pydantic import PrivateAttr
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+logger = logging.getLogger(__name__)
+
+
+class _Backend:
+    """Load, health and circuit state of one backend."""
+
+    __slots__ = (
+        "name", "llm", "health_url", "outstanding", "requests", "failures",
+        "consecutive_failures", "open_until", "healthy"
+    )
+
+    def __init__(self, name: str, llm: BaseLlm, health_url: Optional[str]):
+        self.name = name
+        self.llm = llm
+        self.health_url = health_url
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.healthy = True
+
+    def available(self, now: float) -> bool:
+        """Healthy and not behind an open circuit (half-open counts as available)."""
+        return self.healthy and now >= self.open_until
+
+    def circuit(self, now: float, failure_threshold: int) -> str:
+        if self.consecutive_failures < failure_threshold:
+            return "closed"
+        return "open" if now < self.open_until else "half-open"
+
+
+class ModelPool(BaseLlm):
+    """Model that spreads requests over several backends of the same model.
+
+    Each request goes to the available backend with the fewest requests in
+    flight. Requests of the same conversation (same instruction and first
+    message) prefer the same backend, chosen by rendezvous hashing, so its
+    prompt cache stays warm; they only move when that backend has more than
+    ``affinity_slack`` requests above the least loaded one, or is unavailable.
+
+    A backend whose health check fails is skipped until a check succeeds.
+    After ``failure_threshold`` consecutive failed requests its circuit opens
+    for ``cooldown_seconds``; then one trial request is let through, which
+    closes the circuit on success or reopens it on failure. A request that
+    fails before producing any output is retried on another backend.
+
+    Args:
+        backends: Models to route between, e.g. LiteLlm instances with different api_base
+        backend_names: Names used in logs and stats (defaults to model#index)
+        health_urls: URL per backend answering GET with 2xx when it's up (None = no checks)
+        health_interval_seconds: Time between health checks
+        health_timeout_seconds: Time a health check may take
+        failure_threshold: Consecutive failures that open a backend's circuit
+        cooldown_seconds: Time an open circuit rejects requests
+        affinity_slack: Extra in-flight requests tolerated to keep a conversation on its backend
+    """
+
+    backends: List[BaseLlm]
+    backend_names: List[str] = []
+    health_urls: List[Optional[str]] = []
+    health_interval_seconds: float = 10.0
+    health_timeout_seconds: float = 2.0
+    failure_threshold: int = 3
+    cooldown_seconds: float = 30.0
+    affinity_slack: int = 1
+
+    _backends: List[_Backend] = PrivateAttr(default_factory=list)
+    _health_task: Optional[asyncio.Task] = PrivateAttr(default=None)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {
+        "requests": 0,
+        "retries": 0,
+        "affinity_routed": 0,
+        "failed": 0
+    })
+
+    def __init__(self, backends: List[BaseLlm], **kwargs):
+        if not backends:
+            raise ValueError("ModelPool needs at least one backend")
+        kwargs.setdefault("model", backends[0].model)
+        super().__init__(backends=backends, **kwargs)
+        names = self.backend_names or [f"{llm.model}#{i}" for i, llm in enumerate(backends)]
+        health_urls = self.health_urls or [None] * len(backends)
+        if len(names) != len(backends) or len(health_urls) != len(backends):
+            raise ValueError("backend_names and health_urls need one entry per backend")
+        self._backends = [
+            _Backend(name, llm, url) for name, llm, url in zip(names, backends, health_urls)
+        ]
+
+    @classmethod
+    def from_api_bases(cls, model: str, api_bases: List[str], health_path: str = "/", **kwargs) -> "ModelPool":
+        """Pool of LiteLlm backends serving `model` at each API base.
+
+        Args:
+            model: LiteLLM model name, e.g. ollama_chat/gemma3:1b
+            api_bases: Backend base URLs, e.g. http://ollama-1:11434
+            health_path: Path checked on each backend (Ollama answers GET / when up)
+            **kwargs: Other ModelPool settings
+        """
+        api_bases = [base.rstrip("/") for base in api_bases]
+        return cls(
+            [LiteLlm(model=model, api_base=base) for base in api_bases],
+            backend_names=api_bases,
+            health_urls=[base + health_path for base in api_bases] if health_path is not None else [],
+            **kwargs
+        )
+
+    @property
+    def capabilities(self):
+        return self.backends[0].capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self._ensure_health_checks()
+        self._stats["requests"] += 1
+        affinity = self._affinity_key(llm_request)
+        tried: Set[str] = set()
+
+        while True:
+            backend = self._choose(affinity, tried)
+            tried.add(backend.name)
+            backend.outstanding += 1
+            backend.requests += 1
+            produced = False
+            try:
+                async for response in backend.llm.generate_content_async(llm_request, stream):
+                    produced = True
+                    yield response
+            except Exception as e:
+                self._record_failure(backend)
+                if produced or len(tried) == len(self._backends):
+                    self._stats["failed"] += 1
+                    raise
+                logger.warning(f"Model backend {backend.name} failed ({e}), retrying on another backend")
+                self._stats["retries"] += 1
+                continue
+            finally:
+                backend.outstanding -= 1
+            self._record_success(backend)
+            return
+
+    def _ensure_health_checks(self) -> None:
+        if self._health_task is None and any(b.health_url for b in self._backends):
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """Stop health checks."""
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Routing counters and the state of each backend.
+
+        Returns:
+            Dictionary with request counters and per-backend load, health and circuit state
+        """
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "backends": {
+                b.name: {
+                    "outstanding": b.outstanding,
+                    "requests": b.requests,
+                    "failures": b.failures,
+                    "healthy": b.healthy,
+                    "circuit": b.circuit(now, self.failure_threshold)
+                }
+                for b in self._backends
+            }
+        }
+
+    def _affinity_key(self, llm_request: LlmRequest) -> Optional[str]:
+        """Identifies the conversation by its instruction and first message."""
+        contents = llm_request.contents or []
+        if not contents:
+            return None
+        config = llm_request.config
+        instruction = config.system_instruction if config else None
+        if instruction is not None and not isinstance(instruction, str):
+            instruction = instruction.model_dump(mode="json", exclude_none=True)
+        first = contents[0].model_dump(mode="json", exclude_none=True)
+        return json.dumps([instruction, first], sort_keys=True, default=str)
+
+    def _choose(self, affinity: Optional[str], tried: Set[str]) -> _Backend:
+        now = time.monotonic()
+        untried = [b for b in self._backends if b.name not in tried]
+        candidates = [b for b in untried if b.available(now)]
+        if not candidates:
+            # Nothing is known to work, so try what is closest to recovering
+            candidates = [min(untried, key=lambda b: (not b.healthy, b.open_until))]
+
+        least = min(candidates, key=lambda b: (b.outstanding, b.requests))
+        chosen = least
+        if affinity is not None and len(candidates) > 1:
+            preferred = max(candidates, key=lambda b: hashlib.sha1(f"{b.name}|{affinity}".encode()).digest())
+            if preferred.outstanding <= least.outstanding + self.affinity_slack:
+                chosen = preferred
+                self._stats["affinity_routed"] += 1
+
+        if chosen.circuit(now, self.failure_threshold) == "half-open":
+            # Only one trial request until it's known whether the backend is back
+            chosen.open_until = now + self.cooldown_seconds
+        return chosen
+
+    def _record_failure(self, backend: _Backend) -> None:
+        backend.failures += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.failure_threshold:
+            if backend.consecutive_failures == self.failure_threshold:
+                logger.warning(f"Opening circuit of model backend {backend.name} for {self.cooldown_seconds}s")
+            backend.open_until = time.monotonic() + self.cooldown_seconds
+
+    def _record_success(self, backend: _Backend) -> None:
+        if backend.consecutive_failures >= self.failure_threshold:
+            logger.info(f"Model backend {backend.name} recovered, closing its circuit")
+        backend.consecutive_failures = 0
+        backend.open_until = 0.0
+
+    async def _health_loop(self) -> None:
+        timeout = aiohttp.ClientTimeout(total=self.health_timeout_seconds)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            while True:
+                await asyncio.gather(*(
+                    self._check_health(session, b) for b in self._backends if b.health_url
+                ))
+                await asyncio.sleep(self.health_interval_seconds)
+
+    async def _check_health(self, session: aiohttp.ClientSession, backend: _Backend) -> None:
+        try:
+            async with session.get(backend.health_url) as response:
+                healthy = response.status < 300
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            healthy = False
+        if healthy != backend.healthy:
+            logger.warning(f"Model backend {backend.name} is {'healthy' if healthy else 'unhealthy'}")
+            backend.healthy = healthy
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from ag_ui.core import BaseEvent, EventType, TextMessageContentEvent
+
+logger = logging.getLogger(__name__)
+
+
+class TextDeltaCoalescer:
+    """
+    Merges consecutive TEXT_MESSAGE_CONTENT deltas for one Socket.IO client.
+
+    Deltas for the same message_id are buffered and emitted as a single
+    TextMessageContentEvent once the time window elapses or the byte budget
+    is reached. Any other event flushes the buffer first, so the order of
+    events on the wire is unchanged.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[BaseEvent], Awaitable[None]],
+        window_seconds: float = 0.05,
+        max_bytes: int = 4096
+    ):
+        """
+        Args:
+            emit: Coroutine used to send an event to the client
+            window_seconds: Maximum time a delta may wait in the buffer
+            max_bytes: Flush as soon as the buffered text reaches this size
+        """
+        self._emit = emit
+        self._window = window_seconds
+        self._max_bytes = max_bytes
+        self._lock = asyncio.Lock()
+
+        self._message_id: Optional[str] = None
+        self._parts: List[str] = []
+        self._size = 0
+        self._first_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()  # flushes started by the timer, kept until done
+
+        self.merged_deltas = 0  # deltas absorbed into a previous frame
+
+    async def push(self, event: BaseEvent):
+        """Buffer a content delta or flush and forward any other event."""
+        async with self._lock:
+            if event.type != EventType.TEXT_MESSAGE_CONTENT:
+                await self._flush_locked()
+                await self._emit(event)
+                return
+
+            if self._message_id is not None and self._message_id != event.message_id:
+                await self._flush_locked()
+
+            if self._parts:
+                self.merged_deltas += 1
+            else:
+                self._message_id = event.message_id
+                self._first_at = time.monotonic()
+
+            self._parts.append(event.delta)
+            self._size += len(event.delta.encode("utf-8"))
+
+            if self._size >= self._max_bytes or time.monotonic() - self._first_at >= self._window:
+                await self._flush_locked()
+            elif self._timer is None:
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(self._window, self._on_timer)
+
+    async def flush(self):
+        """Emit any buffered delta immediately."""
+        async with self._lock:
+            await self._flush_locked()
+
+    def close(self):
+        """Drop buffered text and cancel the pending flush timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._message_id = None
+        self._parts = []
+        self._size = 0
+
+    def _on_timer(self):
+        self._timer = None
+        task = asyncio.ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._on_flush_done)
+
+    def _on_flush_done(self, task: asyncio.Task):
+        self._flush_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to flush coalesced text delta: %s", task.exception())
+
+    async def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._parts:
+            return
+
+        event = TextMessageContentEvent(
+            type=EventType.TEXT_MESSAGE_CONTENT,
+            message_id=self._message_id,
+            delta="".join(self._parts)
+        )
+        self._message_id = None
+        self._parts = []
+        self._size = 0
+        await self._emit(event)
@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from ag_ui.core import BaseEvent, EventType, TextMessageContentEvent
+
+logger = logging.getLogger(__name__)
+
+# Slow-client policies, applied when a client's outbound buffer is full
+POLICY_COALESCE = "coalesce"              # merge text deltas into the queued tail
+POLICY_DROP_SNAPSHOTS = "drop_snapshots"  # a new state snapshot replaces queued ones
+POLICY_DISCONNECT = "disconnect"          # disconnect clients blocked for too long
+
+# Disconnecting is the fallback once merging and dropping can't make room: the
+# client can reconnect and resume from the thread's replay buffer, whereas a
+# client left connected would block the run for max_block_seconds per event
+DEFAULT_POLICIES = (POLICY_COALESCE, POLICY_DROP_SNAPSHOTS, POLICY_DISCONNECT)
+
+
+class ClientOutbox:
+    """
+    Bounded outbound buffer for one Socket.IO client.
+
+    Producers put events with push(); a writer task drains the buffer and
+    sends them, so a slow websocket only delays its own client. When the
+    buffer is full the configured policies try to make room before the
+    producer is blocked, which in turn slows down the ADK run feeding it.
+
+    Sequence numbers are opaque to the outbox and never rewritten here: when
+    a policy merges or drops a numbered event, the withdraw callback lets its
+    thread take the number out of the sequence, so a gap on the wire only
+    ever means an event was lost.
+    """
+
+    def __init__(
+        self,
+        sid: str,
+        send: Callable[[BaseEvent, Optional[int]], Awaitable[None]],
+        disconnect: Callable[[], Awaitable[None]],
+        max_events: int = 256,
+        policies: Iterable[str] = DEFAULT_POLICIES,
+        max_block_seconds: float = 30.0,
+        withdraw: Optional[Callable[[int, Optional[int], Optional[BaseEvent]], bool]] = None
+    ):
+        """
+        Args:
+            sid: Socket.IO session id of the client
+            send: Coroutine that writes one event and its sequence number to the client
+            disconnect: Coroutine that disconnects the client
+            max_events: Maximum number of buffered events
+            policies: Slow-client policies to apply when the buffer is full
+            max_block_seconds: How long a producer may wait for room; then the
+                client is dropped with the disconnect policy, otherwise the event
+                is (it stays in the thread's replay buffer for a resume)
+            withdraw: Called as withdraw(seq, into_seq, merged_event) before the event
+                numbered seq is merged into the one numbered into_seq, or as
+                withdraw(seq, None, None) before it is dropped; it returns False to
+                keep the event. Without it numbered events are never merged or dropped
+        """
+        self.sid = sid
+        self._send = send
+        self._disconnect = disconnect
+        self._max_events = max_events
+        self._policies = set(policies)
+        self._max_block = max_block_seconds
+        self._withdraw = withdraw
+
+        self._buffer: Deque[Tuple[BaseEvent, Optional[int]]] = deque()  # (event, seq)
+        self._changed = asyncio.Condition()
+        self._writer: Optional[asyncio.Task] = None
+        self._tasks: set = set()  # disconnects and wakeups started from sync code, kept until done
+        self._closed = False
+
+        # Metrics
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+        self.sent = 0
+        self.merged = 0
+        self.dropped = 0
+
+    async def push(self, event: BaseEvent, seq: Optional[int] = None):
+        """Queue an event for the client, waiting for room if needed.
+
+        Args:
+            event: Event to send
+            seq: Sequence number of the event on its thread, if any
+        """
+        if self._closed:
+            self.dropped += 1
+            return
+
+        if self._writer is None:
+            self._writer = asyncio.ensure_future(self._write_loop())
+
+        async with self._changed:
+            if len(self._buffer) >= self._max_events:
+                if self._make_room(event, seq):
+                    return
+
+            if len(self._buffer) >= self._max_events:
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: self._closed or len(self._buffer) < self._max_events),
+                        timeout=self._max_block
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self.blocked_seconds += time.monotonic() - started
+
+                if len(self._buffer) >= self._max_events and not self._closed:
+                    self.dropped += 1
+                    if POLICY_DISCONNECT in self._policies:
+                        logger.warning("Disconnecting slow client %s, outbound buffer full for %.1fs",
+                                       self.sid, self._max_block)
+                        self._closed = True
+                        self._spawn(self._disconnect())
+                    else:
+                        logger.warning("Dropping %s (seq %s) for slow client %s, outbound buffer full for %.1fs",
+                                       event.type, seq, self.sid, self._max_block)
+                    return
+
+            if self._closed:
+                self.dropped += 1
+                return
+
+            self._buffer.append((event, seq))
+            self.max_depth = max(self.max_depth, len(self._buffer))
+            self._changed.notify_all()
+
+    def _make_room(self, event: BaseEvent, seq: Optional[int]) -> bool:
+        """Apply the slow-client policies to absorb an event into a full buffer.
+
+        Returns:
+            Whether the event was absorbed and must not be appended
+        """
+        if POLICY_COALESCE in self._policies and event.type == EventType.TEXT_MESSAGE_CONTENT:
+            tail, tail_seq = self._buffer[-1]
+            if tail.type == EventType.TEXT_MESSAGE_CONTENT and tail.message_id == event.message_id:
+                merged = TextMessageContentEvent(
+                    type=EventType.TEXT_MESSAGE_CONTENT,
+                    message_id=tail.message_id,
+                    delta=tail.delta + event.delta
+                )
+                # The merged delta keeps the tail's number and the event's number is given up
+                if (seq is None and tail_seq is None) or (
+                    seq is not None and tail_seq is not None and self._withdraw
+                    and self._withdraw(seq, tail_seq, merged)
+                ):
+                    self._buffer[-1] = (merged, tail_seq)
+                    self.merged += 1
+                    return True
+
+        if POLICY_DROP_SNAPSHOTS in self._policies and event.type == EventType.STATE_SNAPSHOT:
+            superseded = [queued for queued in self._buffer if queued[0].type == EventType.STATE_SNAPSHOT]
+            for queued in superseded:
+                dropped_seq = queued[1]
+                if dropped_seq is not None and not (self._withdraw and self._withdraw(dropped_seq, None, None)):
+                    continue
+                self._buffer.remove(queued)
+                self.dropped += 1
+
+        return False
+
+    async def _write_loop(self):
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: self._buffer or self._closed)
+                if self._closed and not self._buffer:
+                    return
+                event, seq = self._buffer.popleft()
+                self._changed.notify_all()
+
+            try:
+                await self._send(event, seq)
+                self.sent += 1
+            except Exception as e:
+                logger.error("Failed to send event to %s: %s", self.sid, e)
+
+    def close(self):
+        """Stop the writer, discard anything still buffered and release blocked producers."""
+        self._closed = True
+        self.dropped += len(self._buffer)
+        self._buffer.clear()
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        # Producers waiting for room only wake up on a notification
+        self._spawn(self._wake())
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+
+    def _on_task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Outbox task for %s failed: %s", self.sid, task.exception())
+
+    async def _wake(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    def first_seq(self) -> Optional[int]:
+        """Sequence number of the oldest numbered event waiting to be sent."""
+        return next((seq for _, seq in self._buffer if seq is not None), None)
+
+    def depth(self) -> int:
+        """Number of events waiting to be sent."""
+        return len(self._buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and slow-consumer metrics for this client."""
+        return {
+            "depth": len(self._buffer),
+            "max_depth": self.max_depth,
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "sent": self.sent,
+            "merged": self.merged,
+            "dropped": self.dropped
+        }
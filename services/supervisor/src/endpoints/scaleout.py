@@ -0,0 +1,185 @@
+import abc
+import asyncio
+import json
+import logging
+import os
+import socket
+from typing import Dict, List, Optional, Tuple
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+logger = logging.getLogger(__name__)
+
+
+
+def current_worker_id() -> str:
+    """Identity of the calling worker process.
+
+    Computed on each call rather than at import, since main.py imports this
+    module before forking its workers.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LocalPubSubManager(AsyncPubSubManager):
+    """
+    In-process stand-in for a Socket.IO message queue.
+
+    Every manager created with the same channel in this process receives the
+    messages published by the others, which is enough to run several
+    AsyncServer instances side by side in tests and benchmarks without a
+    Redis server. It does not connect separate processes.
+    """
+
+    name = 'localpubsub'
+
+    _subscribers: Dict[str, List[asyncio.Queue]] = {}  # channel -> listener queues
+
+    async def _publish(self, data):
+        for queue in list(self._subscribers.get(self.channel, [])):
+            queue.put_nowait(data)
+
+    async def _listen(self):
+        queue = asyncio.Queue()
+        subscribers = self._subscribers.setdefault(self.channel, [])
+        subscribers.append(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            subscribers.remove(queue)
+
+
+class ThreadRegistry(abc.ABC):
+    """
+    Records which worker and Socket.IO client own each conversation thread.
+
+    Each worker keeps a thread's ADK run, pending tool calls and replay
+    buffer in memory, so only the owning worker can resume it. Shared by all
+    supervisor workers so that one receiving a reconnect for a thread it
+    doesn't hold can tell whether another worker still owns it.
+
+    Attributes:
+        worker_id: Identity of the worker this registry records claims for
+    """
+
+    worker_id: str
+
+    @abc.abstractmethod
+    async def claim(self, thread_id: str, sid: str):
+        """Record this worker's client sid as the owner of a thread."""
+
+    @abc.abstractmethod
+    async def owner(self, thread_id: str) -> Optional[Tuple[str, str]]:
+        """The (worker id, sid) owning a thread, or None."""
+
+    @abc.abstractmethod
+    async def release(self, thread_id: str, sid: str):
+        """Forget the owner of a thread if it is still sid."""
+
+
+class InMemoryThreadRegistry(ThreadRegistry):
+    """Thread registry for a single process (default, and for tests)."""
+
+    def __init__(self, worker_id: Optional[str] = None, owners: Optional[Dict[str, Tuple[str, str]]] = None):
+        """
+        Args:
+            worker_id: Identity recorded with claims (defaults to the calling process)
+            owners: Records shared with the registries of other servers in this
+                process, standing in for Redis (defaults to a private dict)
+        """
+        self.worker_id = worker_id or current_worker_id()
+        self._owners: Dict[str, Tuple[str, str]] = {} if owners is None else owners  # thread_id -> (worker, sid)
+
+    async def claim(self, thread_id: str, sid: str):
+        self._owners[thread_id] = (self.worker_id, sid)
+
+    async def owner(self, thread_id: str) -> Optional[Tuple[str, str]]:
+        return self._owners.get(thread_id)
+
+    async def release(self, thread_id: str, sid: str):
+        if self._owners.get(thread_id) == (self.worker_id, sid):
+            del self._owners[thread_id]
+
+
+class RedisThreadRegistry(ThreadRegistry):
+    """Thread registry kept in Redis, shared by every worker on every node."""
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = 'supervisor:thread:',
+        ttl_seconds: int = 86400,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Args:
+            url: Redis connection URL
+            prefix: Key prefix for thread ownership records
+            ttl_seconds: Expiry of ownership records, so crashed workers don't leak keys
+            worker_id: Identity recorded with claims (defaults to the calling process)
+        """
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise RuntimeError('Redis package is not installed '
+                               '(Run "pip install redis" in your virtualenv).')
+
+        self.worker_id = worker_id or current_worker_id()
+        self._redis = aioredis.Redis.from_url(url)
+        self._prefix = prefix
+        self._ttl = ttl_seconds
+
+    async def claim(self, thread_id: str, sid: str):
+        record = json.dumps({'sid': sid, 'worker': self.worker_id})
+        await self._redis.set(self._prefix + thread_id, record, ex=self._ttl)
+
+    async def owner(self, thread_id: str) -> Optional[Tuple[str, str]]:
+        record = await self._redis.get(self._prefix + thread_id)
+        if not record:
+            return None
+        record = json.loads(record)
+        return record['worker'], record['sid']
+
+    async def release(self, thread_id: str, sid: str):
+        if await self.owner(thread_id) == (self.worker_id, sid):
+            await self._redis.delete(self._prefix + thread_id)
+
+
+_local_owners: Dict[str, Dict[str, Tuple[str, str]]] = {}  # local:// URL -> thread records
+
+
+def create_client_manager(url: Optional[str], channel: str = 'supervisor'):
+    """Build the Socket.IO client manager for a message queue URL.
+
+    Args:
+        url: None for a single process, 'local://' for the in-process
+            stand-in, or a redis:// / rediss:// URL for multi-worker mode
+        channel: Pub/sub channel shared by all workers
+
+    Returns:
+        A client manager, or None to use the default in-memory manager
+    """
+    if not url:
+        return None
+    if url.startswith('local://'):
+        return LocalPubSubManager(channel=channel)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return socketio.AsyncRedisManager(url, channel=channel)
+    raise ValueError(f"Unsupported message queue URL: {url}")
+
+
+def create_thread_registry(url: Optional[str], worker_id: Optional[str] = None) -> ThreadRegistry:
+    """Build the thread registry matching create_client_manager().
+
+    Args:
+        url: Message queue URL, as for create_client_manager()
+        worker_id: Identity of the worker (defaults to the calling process)
+    """
+    if url and url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisThreadRegistry(url, worker_id=worker_id)
+    if url and url.startswith('local://'):
+        # Servers of this process sharing the in-process queue share their records too
+        return InMemoryThreadRegistry(worker_id=worker_id, owners=_local_owners.setdefault(url, {}))
+    return InMemoryThreadRegistry(worker_id=worker_id)
@@ -0,0 +1,225 @@
+import json
+import logging
+import zlib
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+_SCALARS = (str, int, float, bool)
+
+
+class _OrjsonModule:
+    """Stand-in for the stdlib json module backed by orjson.
+
+    python-socketio only needs dumps/loads; the separators and other
+    keyword arguments it passes are ignored since orjson always emits
+    compact output.
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
+# json module handed to socketio.AsyncServer(json=...) for packet encoding
+json_module = _OrjsonModule if orjson is not None else json
+
+
+class EventSerializer:
+    """Builds AG-UI camelCase payloads for outbound events.
+
+    The first time an event class is seen with a given set of unset (None)
+    fields, the payload is produced with model_dump(mode='json', by_alias=True)
+    and the resulting key layout is recorded as a plan of (attribute, key)
+    pairs. Later events of the same shape whose values are all scalars (the
+    text and tool-call events that make up most of the traffic) are turned
+    into dicts straight from their attributes. Events carrying nested values
+    or extra fields always go through model_dump, so the output is identical
+    either way, whichever ag_ui version is installed.
+    """
+
+    def __init__(self):
+        self._fields: Dict[type, Optional[List[Tuple[str, str]]]] = {}
+        self._plans: Dict[Tuple[type, int], Optional[List[Tuple[str, str]]]] = {}
+        self.fast_path_count = 0
+        self.fallback_count = 0
+
+    def to_dict(self, event) -> Dict[str, Any]:
+        """Serialize an event to a JSON-ready dict with camelCase keys."""
+        cls = type(event)
+        try:
+            fields = self._fields[cls]
+        except KeyError:
+            fields = self._fields[cls] = self._compile(cls)
+
+        if fields is not None and not getattr(event, '__pydantic_extra__', None):
+            values = event.__dict__
+            unset = 0
+            for index, (name, _) in enumerate(fields):
+                value = values[name]
+                if value is None:
+                    unset |= 1 << index
+                elif not isinstance(value, _SCALARS):
+                    break
+            else:
+                try:
+                    plan = self._plans[(cls, unset)]
+                except KeyError:
+                    return self._learn(event, fields, unset)
+                if plan is not None:
+                    self.fast_path_count += 1
+                    data = {}
+                    for name, key in plan:
+                        value = values[name]
+                        data[key] = value.value if isinstance(value, Enum) else value
+                    return data
+
+        self.fallback_count += 1
+        return event.model_dump(mode='json', by_alias=True)
+
+    def dumps(self, event) -> str:
+        """Serialize an event straight to a JSON string."""
+        return json_module.dumps(self.to_dict(event))
+
+    def _learn(self, event, fields: List[Tuple[str, str]], unset: int) -> Dict[str, Any]:
+        """Record the key layout for an event shape from a reference model_dump."""
+        reference = event.model_dump(mode='json', by_alias=True)
+        values = event.__dict__
+        plan = [(name, key) for name, key in fields if key in reference]
+
+        data = {}
+        for name, key in plan:
+            value = values[name]
+            data[key] = value.value if isinstance(value, Enum) else value
+
+        if data != reference or list(data) != list(reference):
+            logger.debug("No fast serialization plan for %s, using model_dump", type(event).__name__)
+            plan = None
+        self._plans[(type(event), unset)] = plan
+        self.fallback_count += 1
+        return reference
+
+    @staticmethod
+    def _compile(cls) -> Optional[List[Tuple[str, str]]]:
+        """List (attribute, serialized key) pairs for a pydantic event class."""
+        fields = getattr(cls, 'model_fields', None)
+        if not fields or getattr(cls, 'model_computed_fields', None):
+            return None
+        return [
+            (name, field.serialization_alias or field.alias or name)
+            for name, field in fields.items()
+        ]
+
+
+ENCODING_MSGPACK = "msgpack"
+ENCODING_DEFLATE = "deflate"
+
+
+class WireEncoder:
+    """Compact encoding of large outbound payloads.
+
+    Clients list the encodings they can decode when they connect
+    (auth={'encodings': ['msgpack', 'deflate']}). Payloads of at least
+    `threshold_bytes` of JSON sent to such a client are packed with
+    MessagePack and/or compressed with zlib, and wrapped in an envelope
+    whose bytes go out as a Socket.IO binary attachment:
+
+        {'encoding': 'msgpack+deflate', 'seq': 42, 'data': b'...'}
+
+    Everything else, and every payload for clients that did not negotiate
+    an encoding, stays plain JSON.
+    """
+
+    def __init__(self, threshold_bytes: int = 16384, compress_level: int = 6):
+        """
+        Args:
+            threshold_bytes: Minimum JSON size of a payload worth encoding
+            compress_level: zlib compression level for the deflate encoding
+        """
+        self._threshold = threshold_bytes
+        self._compress_level = compress_level
+        self.encoded_count = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @staticmethod
+    def negotiate(offered: Optional[Iterable[str]]) -> Tuple[str, ...]:
+        """Pick the encodings to use from those a client offered.
+
+        Returns:
+            The supported encodings in the order they are applied, empty for JSON
+        """
+        if not offered or isinstance(offered, str):
+            return ()
+        offered = set(offered)
+        chosen = []
+        if ENCODING_MSGPACK in offered and msgpack is not None:
+            chosen.append(ENCODING_MSGPACK)
+        if ENCODING_DEFLATE in offered:
+            chosen.append(ENCODING_DEFLATE)
+        return tuple(chosen)
+
+    def encode(self, payload: Dict[str, Any], encodings: Tuple[str, ...]) -> Dict[str, Any]:
+        """Encode a payload if it is large enough, otherwise return it unchanged."""
+        if not encodings:
+            return payload
+        raw = orjson.dumps(payload) if orjson is not None else json.dumps(payload).encode("utf-8")
+        if len(raw) < self._threshold:
+            return payload
+
+        data = msgpack.packb(payload) if ENCODING_MSGPACK in encodings else raw
+        if ENCODING_DEFLATE in encodings:
+            data = zlib.compress(data, self._compress_level)
+
+        self.encoded_count += 1
+        self.bytes_in += len(raw)
+        self.bytes_out += len(data)
+
+        envelope = {"encoding": "+".join(encodings), "data": data}
+        if "seq" in payload:
+            envelope["seq"] = payload["seq"]
+        return envelope
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Number of encoded payloads and their JSON vs wire size."""
+        return {
+            "encoded": self.encoded_count,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out
+        }
+
+
+class PayloadTracer:
+    """Sampled debug logging of outbound payloads.
+
+    Costs a single isEnabledFor check per event when DEBUG is off for the
+    logger; otherwise one in every `sample_every` payloads is logged.
+    """
+
+    def __init__(self, log: logging.Logger, sample_every: int = 100):
+        self._log = log
+        self._sample_every = max(1, sample_every)
+        self._count = 0
+
+    def trace(self, sid: str, payload: Any):
+        if not self._log.isEnabledFor(logging.DEBUG):
+            return
+        self._count += 1
+        if self._count % self._sample_every:
+            return
+        self._log.debug("Emitting ag-ui event to %s (sampled 1/%d): %s", sid, self._sample_every, payload)
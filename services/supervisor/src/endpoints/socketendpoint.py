@@ -1,21 +1,45 @@
+import asyncio
+import bisect
 import logging
 import json
 import uuid
-from typing import Dict, Any
+from collections import deque
+from typing import Dict, Any, Optional
 from ag_ui.core import (
     TextMessageStartEvent,
     TextMessageContentEvent, 
     TextMessageEndEvent,
     CustomEvent,
+    EventType,
     RunAgentInput,
     UserMessage
 )
 
 from middleware.adk import ADKAgent
 from tools.agui import taskApproval
+from endpoints.event_coalescer import TextDeltaCoalescer
+from endpoints.serialization import EventSerializer, PayloadTracer, WireEncoder
+from endpoints.scaleout import ThreadRegistry, InMemoryThreadRegistry
+from endpoints.outbound import ClientOutbox, DEFAULT_POLICIES
 
 logger = logging.getLogger(__name__)
 
+# Event types that can carry large payloads (state, topology, tool results);
+# only these are considered for compact encoding
+COMPACT_EVENT_TYPES = frozenset({
+    EventType.STATE_SNAPSHOT,
+    EventType.STATE_DELTA,
+    EventType.MESSAGES_SNAPSHOT,
+    EventType.TOOL_CALL_ARGS,
+    EventType.TOOL_CALL_RESULT,
+    EventType.CUSTOM,
+    EventType.RAW,
+})
+
+# forwarded_props a client may set on a user_message, passed through to the
+# agent run (admission priority, full state snapshot); anything else is dropped
+CLIENT_FORWARDED_PROPS = frozenset({"priority", "state_resync"})
+
 class SocketEndpoint:
     """
     Socket.IO endpoint for handling client connections.    
@@ -23,7 +47,55 @@ class SocketEndpoint:
 
     _instance = None
 
-    def __init__(self, sio, adk_agent: ADKAgent = None):
+    def __init__(
+        self,
+        sio,
+        adk_agent: ADKAgent = None,
+        thread_registry: ThreadRegistry = None,
+        coalesce_window_ms: int = 50,
+        coalesce_max_bytes: int = 4096,
+        trace_sample_every: int = 100,
+        outbound_max_events: int = 256,
+        slow_client_policies=DEFAULT_POLICIES,
+        slow_client_max_block_seconds: float = 30.0,
+        incremental_messages: bool = True,
+        max_history_messages: int = 50,
+        disconnect_grace_seconds: float = 15.0,
+        replay_buffer_size: int = 512,
+        compact_threshold_bytes: int = 16384
+    ):
+        """
+        Args:
+            sio: Socket.IO server to register the handlers on
+            adk_agent: ADK middleware used to run user messages
+            thread_registry: Shared registry of the worker and sid owning each thread
+                (defaults to in-process); reconnects for threads owned by another
+                worker are answered with resync_required, and emit_to_thread()
+                reaches their clients through the client manager
+            coalesce_window_ms: Time window for merging text deltas (0 disables coalescing)
+            coalesce_max_bytes: Flush merged text deltas once they reach this size
+            trace_sample_every: Log one in every N outbound payloads at DEBUG level
+            outbound_max_events: Size of the bounded outbound buffer per client
+            slow_client_policies: Policies applied when a client's buffer is full
+                ("coalesce", "drop_snapshots", "disconnect"; all by default, with
+                disconnecting as the fallback when merging and dropping can't make
+                room, after which the client can reconnect and resume)
+            slow_client_max_block_seconds: How long a run may be blocked on a full
+                buffer before the client is dropped ("disconnect") or the event is
+                skipped (the client can fetch it with a resume)
+            incremental_messages: Send only the new message of each turn; the ADK
+                session keeps the conversation server-side
+            max_history_messages: Number of messages kept locally per client
+            disconnect_grace_seconds: How long a disconnected client's thread is kept
+                before its in-flight run is cancelled; reconnecting with
+                auth={'thread_id': ...} within this window resumes the thread
+            replay_buffer_size: Number of recent events kept per thread; a client
+                reconnecting with auth={'thread_id': ..., 'last_seq': ...} (or
+                sending a 'resume' event) is sent the events it missed
+            compact_threshold_bytes: Payloads at least this large are sent
+                MessagePack and/or deflate encoded to clients that connect with
+                auth={'encodings': [...]}; other clients always get JSON
+        """
         logger.info("SocketEndpoint init")
 
         SocketEndpoint._instance = self
@@ -31,14 +103,210 @@ class SocketEndpoint:
         self.sio = sio
         self.adk_agent = adk_agent
         self.active_sessions: Dict[str, Dict[str, Any]] = {}  # sid -> session info
+        self.thread_registry = thread_registry or InMemoryThreadRegistry()
+        self._coalesce_window = coalesce_window_ms / 1000.0
+        self._coalesce_max_bytes = coalesce_max_bytes
+        self._coalescers: Dict[str, TextDeltaCoalescer] = {}  # thread_id -> text delta coalescer
+        self._serializer = EventSerializer()
+        self._tracer = PayloadTracer(logger, sample_every=trace_sample_every)
+        self._outbound_max_events = outbound_max_events
+        self._slow_client_policies = tuple(slow_client_policies)
+        self._slow_client_max_block = slow_client_max_block_seconds
+        self._outboxes: Dict[str, ClientOutbox] = {}  # sid -> bounded outbound buffer
+        self._incremental_messages = incremental_messages
+        self._max_history_messages = max_history_messages
+        self._disconnect_grace = disconnect_grace_seconds
+        self._replay_buffer_size = replay_buffer_size
+        self._wire_encoder = WireEncoder(threshold_bytes=compact_threshold_bytes)
+        self._client_encodings: Dict[str, tuple] = {}  # sid -> negotiated encodings
+        self._detached: Dict[str, Dict[str, Any]] = {}  # thread_id -> session info awaiting reconnect
+        self._expiry_tasks: set = set()  # expirations of detached threads, kept until done
+        self._connected_sids = set()
         self.callbacks()
 
     async def emit_agui_event(self, event, sid):
+        """Emit an ag-ui event to a client, on its thread's stream if it has one"""
+        session_info = self.active_sessions.get(sid)
+        if session_info is not None:
+            await self.emit_thread_event(event, session_info)
+        elif sid in self._connected_sids:
+            await self._outbox(sid).push(event)
+        else:
+            logger.debug("Dropping %s for disconnected client %s", event.type, sid)
+
+    async def emit_to_thread(self, event, thread_id: str) -> bool:
+        """Emit an ag-ui event to the client following a thread, on any worker
+
+        A thread held by this worker gets the event on its stream (numbered and
+        kept for replay). A thread owned by another worker is reached through
+        the client manager's queue; the event is then sent as plain JSON and
+        is not numbered, since the replay buffer lives on the owning worker.
+
+        Returns:
+            True if the thread has an owner the event was sent to
+        """
+        owner = await self.thread_registry.owner(thread_id)
+        if owner is None:
+            logger.debug("Dropping %s for unowned thread %s", event.type, thread_id)
+            return False
+
+        worker_id, sid = owner
+        if worker_id == self.thread_registry.worker_id:
+            session_info = self.active_sessions.get(sid) or self._detached.get(thread_id)
+            if session_info is None:
+                return False
+            await self.emit_thread_event(event, session_info)
+            return True
+
+        await self.sio.emit('agui_event', self._serializer.to_dict(event), room=sid)
+        return True
+
+    async def emit_thread_event(self, event, session_info: Dict[str, Any]):
+        """Emit an ag-ui event on a thread's stream, merging consecutive text deltas
+
+        Events are numbered and kept for replay even while the thread's client
+        is disconnected, so it can catch up when it comes back. Once its grace
+        period has expired nobody can, and the events are dropped.
+        """
+        if session_info.get('closed'):
+            logger.debug("Dropping %s for expired thread %s", event.type, session_info['thread_id'])
+            return
+
+        if self._coalesce_window <= 0:
+            await self._sequence(event, session_info)
+            return
+
+        thread_id = session_info['thread_id']
+        coalescer = self._coalescers.get(thread_id)
+        if coalescer is None:
+            async def emit(ev):
+                await self._sequence(ev, session_info)
+            coalescer = TextDeltaCoalescer(
+                emit,
+                window_seconds=self._coalesce_window,
+                max_bytes=self._coalesce_max_bytes
+            )
+            self._coalescers[thread_id] = coalescer
+        await coalescer.push(event)
+
+    async def flush_agui_events(self, sid):
+        """Send any text delta still buffered for a client"""
+        session_info = self.active_sessions.get(sid)
+        if session_info is not None:
+            await self.flush_thread_events(session_info)
+
+    async def flush_thread_events(self, session_info: Dict[str, Any]):
+        """Send any text delta still buffered on a thread's stream"""
+        coalescer = self._coalescers.get(session_info['thread_id'])
+        if coalescer:
+            await coalescer.flush()
+
+    async def _sequence(self, event, session_info: Dict[str, Any]):
+        """Number an event, keep it for replay and queue it for the thread's client
+
+        Events get consecutive ids on their thread. The seq a client sees is
+        derived from the id when the event is sent (see _wire_seq), so ids
+        never change when the outbox merges or drops an event.
+        """
+        event_id = session_info['seq'] + 1
+        session_info['seq'] = event_id
+        session_info['replay'].append([event_id, event])
+        if len(session_info['withdrawn']) > self._replay_buffer_size:
+            self._prune_withdrawn(session_info)
+
+        sid = session_info['sid']
+        if sid in self._connected_sids and not session_info['resuming']:
+            await self._outbox(sid).push(event, event_id)
+
+    def _outbox(self, sid) -> ClientOutbox:
+        """Get or create the bounded outbound buffer of a client"""
+        outbox = self._outboxes.get(sid)
+        if outbox is None:
+            async def send(ev, event_id):
+                session_info = self.active_sessions.get(sid)
+                seq = self._wire_seq(session_info, event_id) if event_id is not None and session_info else None
+                await self._send(ev, sid, seq)
+
+            async def disconnect():
+                await self.sio.disconnect(sid)
+
+            def withdraw(event_id, into_id, merged):
+                session_info = self.active_sessions.get(sid)
+                if session_info is None:
+                    return False
+                return self._withdraw(session_info, event_id, into_id, merged)
+
+            outbox = ClientOutbox(
+                sid,
+                send,
+                disconnect,
+                max_events=self._outbound_max_events,
+                policies=self._slow_client_policies,
+                max_block_seconds=self._slow_client_max_block,
+                withdraw=withdraw
+            )
+            self._outboxes[sid] = outbox
+        return outbox
+
+    def _withdraw(self, session_info: Dict[str, Any], event_id: int, into_id: Optional[int], merged) -> bool:
+        """Take an event the outbox merged or dropped out of the thread's sequence
+
+        The event's replay entry is emptied (its content is now in the event
+        into_id, if given) and its id recorded as withdrawn, which moves the
+        seq of every later event down by one when it is sent. Nothing already
+        sent is affected: the outbox only withdraws events it still holds, and
+        everything after them is unsent too.
+
+        Returns:
+            True, the event can always be withdrawn
+        """
+        replay = session_info['replay']
+        if replay:
+            first = replay[0][0]
+            # The ring holds consecutive ids, and withdrawals happen near its end
+            if 0 <= event_id - first < len(replay):
+                replay[event_id - first][1] = None
+            if into_id is not None and 0 <= into_id - first < len(replay):
+                replay[into_id - first][1] = merged
+        bisect.insort(session_info['withdrawn'], event_id)
+        return True
+
+    def _wire_seq(self, session_info: Dict[str, Any], event_id: int) -> int:
+        """The contiguous seq a client sees for an event id: the id less the withdrawn ids before it"""
+        withdrawn = session_info['withdrawn']
+        return event_id - session_info['withdrawn_before'] - bisect.bisect_left(withdrawn, event_id)
+
+    def _prune_withdrawn(self, session_info: Dict[str, Any]):
+        """Fold withdrawn ids older than anything still replayable or queued into a count"""
+        keep_from = session_info['replay'][0][0]
+        outbox = self._outboxes.get(session_info['sid'])
+        queued = outbox.first_seq() if outbox else None
+        if queued is not None:
+            keep_from = min(keep_from, queued)
+        withdrawn = session_info['withdrawn']
+        cut = bisect.bisect_left(withdrawn, keep_from)
+        del withdrawn[:cut]
+        session_info['withdrawn_before'] += cut
+
+    def get_outbound_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and time blocked on each connected client"""
+        return {sid: outbox.get_stats() for sid, outbox in self._outboxes.items()}
+
+    def get_encoding_stats(self) -> Dict[str, Any]:
+        """Number of compact-encoded payloads and bytes saved on the wire"""
+        return self._wire_encoder.get_stats()
+
+    async def _send(self, event, sid, seq=None):
         """Helper method to emit ag-ui events with proper serialization"""
         try:
-            # Use mode='json' and by_alias=True for proper camelCase field names
-            event_data = event.model_dump(mode='json', by_alias=True)
-            logger.info("Emitting ag-ui event: %s", event_data)
+            # camelCase field names, same output as model_dump(mode='json', by_alias=True)
+            event_data = self._serializer.to_dict(event)
+            if seq is not None:
+                event_data['seq'] = seq
+            encodings = self._client_encodings.get(sid)
+            if encodings and event.type in COMPACT_EVENT_TYPES:
+                event_data = self._wire_encoder.encode(event_data, encodings)
+            self._tracer.trace(sid, event_data)
             await self.sio.emit('agui_event', event_data, room=sid)
         except Exception as e:
             logger.error("Failed to emit ag-ui event: %s", e)
@@ -48,23 +316,203 @@ class SocketEndpoint:
         @self.sio.event
         async def connect(sid, environ, auth):
             logger.info("connected client %s", sid)
+            self._connected_sids.add(sid)
+            if isinstance(auth, dict):
+                encodings = WireEncoder.negotiate(auth.get('encodings'))
+                if encodings:
+                    self._client_encodings[sid] = encodings
+                    logger.info("Client %s negotiated encodings %s", sid, encodings)
+            if isinstance(auth, dict) and auth.get('thread_id'):
+                await self._resume_session(sid, auth['thread_id'], auth.get('last_seq'))
 
         @self.sio.event
         async def agui_event(sid, data):
-            logger.info("agui event from %s: %s", sid, data)
+            logger.debug("agui event from %s: %s", sid, data)
             
             # Handle custom events from Flutter client
             if isinstance(data, dict) and data.get('name') == 'user_message':
                 await self._handle_user_message(sid, data)
+            elif isinstance(data, dict) and data.get('name') == 'resume':
+                value = data.get('value') or {}
+                await self._resume_session(sid, value.get('thread_id'), value.get('last_seq'))
+            elif isinstance(data, dict) and data.get('name') == 'state_resync':
+                session_info = self.active_sessions.get(sid)
+                if session_info and self.adk_agent:
+                    self.adk_agent.reset_state_baseline(session_info['thread_id'])
             else:
                 logger.warning("Received unhandled event: %s", data)
 
         @self.sio.event
         async def disconnect(sid):
             logger.info("disconnected from %s", sid)
+            self._connected_sids.discard(sid)
+            self._client_encodings.pop(sid, None)
             # Clean up session data
-            if sid in self.active_sessions:
-                del self.active_sessions[sid]
+            session_info = self.active_sessions.pop(sid, None)
+            if session_info:
+                # The thread stays claimed by this worker until its grace period expires
+                self._detach_session(session_info)
+            outbox = self._outboxes.pop(sid, None)
+            if outbox:
+                logger.info("Outbound stats for %s: %s", sid, outbox.get_stats())
+                outbox.close()
+
+    def _detach_session(self, session_info: Dict[str, Any]):
+        """Keep a disconnected client's thread for the grace period, then cancel its run"""
+        thread_id = session_info['thread_id']
+        loop = asyncio.get_running_loop()
+        session_info['expiry'] = loop.call_later(self._disconnect_grace, self._start_expiry, thread_id)
+        self._detached[thread_id] = session_info
+        logger.debug("Detached thread %s, cancelling in %ss unless the client reconnects",
+                     thread_id, self._disconnect_grace)
+
+    def _start_expiry(self, thread_id: str):
+        task = asyncio.ensure_future(self._expire_detached_session(thread_id))
+        self._expiry_tasks.add(task)
+        task.add_done_callback(self._on_expiry_done)
+
+    def _on_expiry_done(self, task: asyncio.Task):
+        self._expiry_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to expire detached thread: %s", task.exception())
+
+    async def _expire_detached_session(self, thread_id: str):
+        """Cancel the in-flight and queued runs of a thread whose client did not come back"""
+        session_info = self._detached.pop(thread_id, None)
+        if session_info is None:
+            return
+        # The run may still emit a few events; they must not bring the thread back
+        session_info['closed'] = True
+        await self.thread_registry.release(thread_id, session_info['sid'])
+        coalescer = self._coalescers.pop(thread_id, None)
+        if coalescer:
+            coalescer.close()
+        if self.adk_agent and await self.adk_agent.cancel_execution(thread_id):
+            logger.info("Cancelled orphaned runs for thread %s", thread_id)
+
+    async def _resume_session(self, sid: str, thread_id: str, last_seq=None) -> bool:
+        """Attach a thread to a client and replay the events it missed
+
+        Args:
+            sid: Socket.IO session id of the client
+            thread_id: Thread the client was following
+            last_seq: Sequence number of the last event the client received,
+                or None to only reattach the thread
+
+        Returns:
+            True if the thread was found
+        """
+        if not thread_id:
+            return False
+
+        session_info = self.active_sessions.get(sid)
+        if session_info is None or session_info['thread_id'] != thread_id:
+            session_info = await self._reattach_session(sid, thread_id)
+
+        if session_info is None:
+            owner = await self.thread_registry.owner(thread_id)
+            if owner and owner[0] != self.thread_registry.worker_id:
+                # Runs and replay buffers live in the owning worker's memory
+                logger.warning("Thread %s is owned by worker %s, %s can't resume it here",
+                               thread_id, owner[0], sid)
+                await self._send_resync_required(sid, thread_id, last_seq, reason="owned_by_other_worker")
+            elif last_seq is not None:
+                await self._send_resync_required(sid, thread_id, last_seq)
+            return False
+
+        if last_seq is not None:
+            await self._replay(session_info, int(last_seq))
+        return True
+
+    async def _reattach_session(self, sid: str, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Move a detached thread, or one still held by a stale sid, onto a reconnected client's sid"""
+        session_info = self._detached.pop(thread_id, None)
+        if session_info is not None:
+            session_info.pop('expiry').cancel()
+        else:
+            session_info = self._take_over_session(sid, thread_id)
+        if session_info is None:
+            logger.info("No detached thread %s for %s, starting a new session", thread_id, sid)
+            return None
+
+        previous = self.active_sessions.pop(sid, None)
+        if previous is not None:
+            self._detach_session(previous)
+        session_info['sid'] = sid
+        self.active_sessions[sid] = session_info
+        await self.thread_registry.claim(thread_id, sid)
+        logger.info("Reattached thread %s to %s", thread_id, sid)
+        return session_info
+
+    def _take_over_session(self, sid: str, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Detach a thread from a sid whose disconnect hasn't been noticed yet
+
+        A client may reconnect before the server sees its old connection drop;
+        the thread follows the client, and the old sid stops receiving its events.
+        """
+        stale_sid = next(
+            (other for other, info in self.active_sessions.items() if info['thread_id'] == thread_id and other != sid),
+            None
+        )
+        if stale_sid is None:
+            return None
+        session_info = self.active_sessions.pop(stale_sid)
+        outbox = self._outboxes.pop(stale_sid, None)
+        if outbox:
+            outbox.close()
+        logger.info("Taking thread %s over from stale %s for %s", thread_id, stale_sid, sid)
+        return session_info
+
+    async def _replay(self, session_info: Dict[str, Any], last_seq: int):
+        """Resend the events of a thread numbered after last_seq to its client
+
+        Live events are held back (they are still numbered and buffered) until
+        the replay has caught up, so the client sees every event once and in
+        order. If the ring buffer no longer reaches back to last_seq the client
+        is told to resynchronize before the remaining events are replayed.
+        """
+        sid = session_info['sid']
+        thread_id = session_info['thread_id']
+        replay = session_info['replay']
+        kept = [entry_id for entry_id, event in replay if event is not None]
+        newest = session_info['seq'] - session_info['withdrawn_before'] - len(session_info['withdrawn'])
+        oldest = self._wire_seq(session_info, kept[0]) if kept else newest + 1
+        if last_seq + 1 < oldest or last_seq > newest:
+            logger.warning("Cannot replay thread %s from seq %d (buffer holds %d-%d)",
+                           thread_id, last_seq, oldest, newest)
+            await self._send_resync_required(sid, thread_id, last_seq)
+            last_seq = min(last_seq, oldest - 1)
+
+        # Id of the last event the client has; later ones are replayed
+        cursor = next(
+            (entry_id - 1 for entry_id in kept if self._wire_seq(session_info, entry_id) > last_seq),
+            session_info['seq']
+        )
+        replayed = 0
+        session_info['resuming'] = True
+        try:
+            while sid in self._connected_sids:
+                missing = [(entry_id, event) for entry_id, event in replay if entry_id > cursor and event is not None]
+                if not missing:
+                    break
+                for entry_id, event in missing:
+                    await self._outbox(sid).push(event, entry_id)
+                    cursor = entry_id
+                replayed += len(missing)
+        finally:
+            session_info['resuming'] = False
+        logger.info("Replayed %d events of thread %s to %s", replayed, thread_id, sid)
+
+    async def _send_resync_required(self, sid: str, thread_id: str, last_seq, reason: str = "replay_unavailable"):
+        """Tell a client the events after last_seq can't be replayed"""
+        if self.adk_agent:
+            # State deltas may be among the lost events
+            self.adk_agent.reset_state_baseline(thread_id)
+        resync_event = CustomEvent(
+            name="resync_required",
+            value={"threadId": thread_id, "lastSeq": last_seq, "reason": reason}
+        )
+        await self._outbox(sid).push(resync_event)
 
     async def _handle_user_message(self, sid: str, data: Dict[str, Any]):
         """Handle user message from Flutter client and process through ADK agent"""
@@ -75,13 +523,12 @@ class SocketEndpoint:
                 return
 
             user_message_data = data.get('value', {})
-            message_id = user_message_data.get('id', str(uuid.uuid4()))
             content = user_message_data.get('content', '')
             
             logger.info(f"Processing user message from {sid}: {content}")
             
             # Get or create session info
-            session_info = self._get_or_create_session(sid)
+            session_info = await self._get_or_create_session(sid)
             thread_id = session_info['thread_id']
             
             # Create UserMessage for the conversation
@@ -91,38 +538,63 @@ class SocketEndpoint:
                 content=content
             )
             
-            # Add to session history
+            # Add to session history (bounded, the ADK session holds the full conversation)
             session_info['messages'].append(user_message)
+
+            if self._incremental_messages:
+                # Only the message added this turn
+                messages = [user_message]
+            else:
+                messages = list(session_info['messages'])
             
             # Create RunAgentInput
             run_input = RunAgentInput(
                 thread_id=thread_id,
                 run_id=str(uuid.uuid4()),
                 state=session_info.get('state', {}),
-                messages=session_info['messages'],
+                messages=messages,
                 tools=[taskApproval],  # Add tools if needed
                 context=[],  # Add context if needed
-                forwarded_props={}
+                forwarded_props=self._forwarded_props(user_message_data)
             )
             
-            # Run the ADK agent and stream events back to client
+            # Run the ADK agent and stream events back to client; the thread
+            # may move to a new sid if the client reconnects mid-run
             async for event in self.adk_agent.run(run_input):
-                await self.emit_agui_event(event, sid)
+                await self.emit_thread_event(event, session_info)
+            await self.flush_thread_events(session_info)
                 
         except Exception as e:
             logger.error(f"Error handling user message: {e}", exc_info=True)
             await self._send_error(sid, f"Error processing message: {str(e)}")
 
-    def _get_or_create_session(self, sid: str) -> Dict[str, Any]:
+    def _forwarded_props(self, user_message_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Client-supplied forwarded_props of a user message, limited to CLIENT_FORWARDED_PROPS"""
+        props = user_message_data.get('forwarded_props')
+        if not isinstance(props, dict):
+            return {}
+        dropped = props.keys() - CLIENT_FORWARDED_PROPS
+        if dropped:
+            logger.debug("Ignoring forwarded_props %s from client", sorted(dropped))
+        return {key: value for key, value in props.items() if key in CLIENT_FORWARDED_PROPS}
+
+    async def _get_or_create_session(self, sid: str) -> Dict[str, Any]:
         """Get or create session info for a Socket.IO session"""
         if sid not in self.active_sessions:
             thread_id = str(uuid.uuid4())
             self.active_sessions[sid] = {
+                'sid': sid,
                 'thread_id': thread_id,
-                'messages': [],
+                'messages': deque(maxlen=self._max_history_messages),
                 'state': {},
+                'seq': 0,  # id of the last event emitted on this thread
+                'replay': deque(maxlen=self._replay_buffer_size),  # [id, event] ring buffer, event None once withdrawn
+                'withdrawn': [],  # sorted ids merged or dropped by the outbox, left out of the seq clients see
+                'withdrawn_before': 0,  # withdrawn ids older than the replay buffer, pruned from the list
+                'resuming': False,
                 'created_at': None  # Could add timestamp if needed
             }
+            await self.thread_registry.claim(thread_id, sid)
             logger.info(f"Created new session for {sid}: {thread_id}")
         
         return self.active_sessions[sid]
@@ -1,4 +1,6 @@
+from collections import OrderedDict
 from typing import Optional, Dict, Callable, Any, AsyncGenerator, List
+import copy
 import json
 import asyncio
 import inspect
@@ -6,15 +8,17 @@ import inspect
 from ag_ui.core import (
     RunAgentInput, BaseEvent, EventType,
     RunStartedEvent, RunFinishedEvent, RunErrorEvent,
-    ToolCallEndEvent, SystemMessage,ToolCallResultEvent
+    ToolCallStartEvent, ToolCallEndEvent, SystemMessage,ToolCallResultEvent,
+    CustomEvent, StateDeltaEvent
 )
 
 from google.adk import Runner
 from google.adk.agents import BaseAgent, RunConfig as ADKRunConfig
-from google.adk.agents.run_config import StreamingMode
+from google.adk.agents.run_config import StreamingMode, ToolThreadPoolConfig
 from google.adk.sessions import BaseSessionService, InMemorySessionService
 from google.adk.artifacts import BaseArtifactService, InMemoryArtifactService
 from google.adk.memory import BaseMemoryService, InMemoryMemoryService
+from google.adk.events import Event
 from google.adk.auth.credential_service.base_credential_service import BaseCredentialService
 from google.adk.auth.credential_service.in_memory_credential_service import InMemoryCredentialService
 from google.genai import types
@@ -22,11 +26,23 @@ from google.genai import types
 from .event_translator import EventTranslator
 from .session_manager import SessionManager
 from .execution_state import ExecutionState
-from .client_proxy_toolset import ClientProxyToolset
+from .admission import AdmissionScheduler
+from .deadlines import DeadlineScheduler
+from .client_proxy_toolset import ClientProxyToolset, current_event_queue
+from .runner_cache import RunnerCache, runner_fingerprint
+from .pending_tool_calls import PENDING_NAMES_KEY, PendingToolCallIndex
+from .json_patch import JsonPatchError, apply_patch, make_patch
+from .tool_timeouts import tool_timeout_result, with_tool_timeouts
+from .context_compactor import ContextCompactor
 
 import logging
 logger = logging.getLogger(__name__)
 
+# Pending client tool calls of a thread whose deadlines fall this close to an
+# expiring one are timed out with it, so the calls of one model turn are
+# answered together
+TOOL_TIMEOUT_BATCH_SECONDS = 1.0
+
 class ADKAgent:
     """Middleware to bridge AG-UI Protocol with Google ADK agents.
     
@@ -62,6 +78,12 @@ class ADKAgent:
         execution_timeout_seconds: int = 600,  # 10 minutes
         tool_timeout_seconds: int = 300,  # 5 minutes
         max_concurrent_executions: int = 10,
+        max_queued_runs: int = 100,
+        max_queued_events: int = 1000,
+        runner_cache_size: int = 32,
+        max_state_baselines: int = 1024,
+        tool_thread_pool_workers: Optional[int] = 8,
+        context_compactor: Optional[ContextCompactor] = None,
         
         # Session cleanup configuration
         cleanup_interval_seconds: int = 300  # 5 minutes default
@@ -81,8 +103,27 @@ class ADKAgent:
             run_config_factory: Function to create RunConfig per request
             use_in_memory_services: Use in-memory implementations for unspecified services
             execution_timeout_seconds: Timeout for entire execution
-            tool_timeout_seconds: Timeout for individual tool calls
+            tool_timeout_seconds: Timeout for individual tool calls. Backend function tools
+                return a timeout result to the model when it passes; client-side (HITL)
+                calls still unanswered are given a timeout result in the session and released
             max_concurrent_executions: Maximum concurrent background executions
+            max_queued_runs: Runs allowed to wait for a free execution slot; they are
+                admitted by priority (forwarded_props['priority']), round-robin across
+                users, and receive 'queue_position' custom events while waiting
+            max_queued_events: Bound on each execution's event queue; a slow consumer
+                applies backpressure to the ADK run instead of growing memory
+            runner_cache_size: Number of prepared agent copies and runners kept for
+                reuse, keyed by app, SystemMessage and client tool definitions
+            max_state_baselines: Number of threads whose last sent state is kept so a
+                run can end with a JSON Patch STATE_DELTA instead of a full snapshot;
+                other threads get a snapshot, as do runs with forwarded_props['state_resync']
+            tool_thread_pool_workers: Size of the thread pool that synchronous backend tools
+                (e.g. runtask) run on, so the function calls of one model turn execute
+                concurrently without blocking the event loop; None runs them on the loop.
+                Applied to every RunConfig that doesn't set tool_thread_pool_config itself
+            context_compactor: Shortens the session history sent to the model on each call
+                (older turns summarized or dropped, bulky tool results cut, token budget);
+                None sends the full history
         """
         if app_name and app_name_extractor:
             raise ValueError("Cannot specify both 'app_name' and 'app_name_extractor'")
@@ -98,6 +139,8 @@ class ADKAgent:
         self._static_user_id = user_id
         self._user_id_extractor = user_id_extractor
         self._run_config_factory = run_config_factory or self._default_run_config
+        self._tool_thread_pool_workers = tool_thread_pool_workers
+        self._context_compactor = context_compactor
         
         # Initialize services with intelligent defaults
         if use_in_memory_services:
@@ -122,6 +165,7 @@ class ADKAgent:
             session_timeout_seconds=session_timeout_seconds,  # 20 minutes default
             cleanup_interval_seconds=cleanup_interval_seconds,
             max_sessions_per_user=None,    # No limit by default
+            pending_tool_call_timeout_seconds=tool_timeout_seconds,
             auto_cleanup=True              # Enable by default
         )
         
@@ -130,11 +174,26 @@ class ADKAgent:
         self._execution_timeout = execution_timeout_seconds
         self._tool_timeout = tool_timeout_seconds
         self._max_concurrent = max_concurrent_executions
+        self._admission = AdmissionScheduler(max_concurrent_executions, max_waiting=max_queued_runs)
+        self._max_queued_events = max_queued_events
         self._execution_lock = asyncio.Lock()
+        self._deadlines = DeadlineScheduler()  # execution timeouts, one timer for all runs
+        self._runner_cache = RunnerCache(max_entries=runner_cache_size)
+
+        # Pending (HITL) tool calls and their tool names per thread, so results can
+        # be matched even when the client only submits new messages; written to
+        # session state once per run
+        self._pending_calls = PendingToolCallIndex(self._session_manager)
+        self._session_manager.use_pending_index(self._pending_calls)
+        self._tool_call_deadlines: Dict[tuple, Any] = {}  # (thread_id, tool_call_id) -> DeadlineHandle
+        self._expired_tool_calls: "OrderedDict[tuple, None]" = OrderedDict()  # recently expired, to reject late results
+        self._expiry_tasks: set = set()
 
-        # Session lookup cache for efficient session ID to metadata mapping
-        # Maps session_id -> {"app_name": str, "user_id": str}
-        self._session_lookup_cache: Dict[str, Dict[str, str]] = {}
+        # State last sent to the client of each thread, least recently used first
+        self._state_baselines: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._max_state_baselines = max_state_baselines
+        self._state_snapshots_sent = 0
+        self._state_deltas_sent = 0
         
         # Event translator will be created per-session for thread safety
         
@@ -150,25 +209,8 @@ class ADKAgent:
         Returns:
             Dictionary with app_name and user_id, or None if not found
         """
-        # Try cache first for O(1) lookup
-        if session_id in self._session_lookup_cache:
-            return self._session_lookup_cache[session_id]
-
-        # Fallback to linear search if not in cache (for existing sessions)
-        # This maintains backward compatibility
-        try:
-            for uid, keys in self._session_manager._user_sessions.items():
-                for key in keys:
-                    if key.endswith(f":{session_id}"):
-                        app_name = key.split(':', 1)[0]
-                        metadata = {"app_name": app_name, "user_id": uid}
-                        # Cache for future lookups
-                        self._session_lookup_cache[session_id] = metadata
-                        return metadata
-        except Exception as e:
-            logger.error(f"Error during session metadata lookup for {session_id}: {e}")
-
-        return None
+        # O(1) lookup in the session manager's index
+        return self._session_manager.lookup_session(session_id)
     
     def _get_app_name(self, input: RunAgentInput) -> str:
         """Resolve app name with clear precedence."""
@@ -197,94 +239,118 @@ class ADKAgent:
         else:
             return self._default_user_extractor(input)
     
+    def _get_priority(self, input: RunAgentInput) -> int:
+        """Admission priority of a run, from forwarded_props['priority'] (default 0)."""
+        props = input.forwarded_props if isinstance(input.forwarded_props, dict) else {}
+        try:
+            return int(props.get('priority', 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def _wants_state_resync(self, input: RunAgentInput) -> bool:
+        """Whether the client asked for a full state snapshot (forwarded_props['state_resync'])."""
+        props = input.forwarded_props if isinstance(input.forwarded_props, dict) else {}
+        return bool(props.get('state_resync'))
+
     def _default_user_extractor(self, input: RunAgentInput) -> str:
         """Default user extraction logic."""
         # Use thread_id as default (assumes thread per user)
         return f"thread_user_{input.thread_id}"
     
-    async def _add_pending_tool_call_with_context(self, session_id: str, tool_call_id: str, app_name: str, user_id: str):
+    async def _add_pending_tool_call_with_context(self, session_id: str, tool_call_id: str, app_name: str, user_id: str, tool_name: Optional[str] = None):
         """Add a tool call to the session's pending list for HITL tracking.
         
+        The in-memory index is updated immediately; session state is written
+        once at the end of the run by _flush_pending_tool_calls.
+        
         Args:
             session_id: The session ID (thread_id)
             tool_call_id: The tool call ID to track
             app_name: App name (for session lookup)
             user_id: User ID (for session lookup)
+            tool_name: Name of the called tool, used to build the function response
         """
         logger.debug(f"Adding pending tool call {tool_call_id} for session {session_id}, app_name={app_name}, user_id={user_id}")
-        try:
-            # Get current pending calls using SessionManager
-            pending_calls = await self._session_manager.get_state_value(
-                session_id=session_id,
-                app_name=app_name,
-                user_id=user_id,
-                key="pending_tool_calls",
-                default=[]
-            )
-            
-            # Add new tool call if not already present
-            if tool_call_id not in pending_calls:
-                pending_calls.append(tool_call_id)
-                
-                # Update the state using SessionManager
-                success = await self._session_manager.set_state_value(
-                    session_id=session_id,
-                    app_name=app_name,
-                    user_id=user_id,
-                    key="pending_tool_calls",
-                    value=pending_calls
-                )
-                
-                if success:
-                    logger.info(f"Added tool call {tool_call_id} to session {session_id} pending list")
-        except Exception as e:
-            logger.error(f"Failed to add pending tool call {tool_call_id} to session {session_id}: {e}")
+        self._pending_calls.add(session_id, tool_call_id, tool_name)
+        self._schedule_tool_call_deadline(session_id, tool_call_id, app_name, user_id)
     
-    async def _remove_pending_tool_call(self, session_id: str, tool_call_id: str):
+    def _remove_pending_tool_call(self, session_id: str, tool_call_id: str) -> bool:
         """Remove a tool call from the session's pending list.
 
-        Uses efficient session lookup to find the session without needing explicit app_name/user_id.
-
         Args:
             session_id: The session ID (thread_id)
             tool_call_id: The tool call ID to remove
+
+        Returns:
+            True if the tool call was pending
         """
-        try:
-            # Use efficient session metadata lookup
-            metadata = self._get_session_metadata(session_id)
-
-            if metadata:
-                app_name = metadata["app_name"]
-                user_id = metadata["user_id"]
-
-                # Get current pending calls using SessionManager
-                pending_calls = await self._session_manager.get_state_value(
-                    session_id=session_id,
-                    app_name=app_name,
-                    user_id=user_id,
-                    key="pending_tool_calls",
-                    default=[]
-                )
+        deadline = self._tool_call_deadlines.pop((session_id, tool_call_id), None)
+        if deadline is not None:
+            deadline.cancel()
+        return self._pending_calls.remove(session_id, tool_call_id)
+    
+    def _schedule_tool_call_deadline(self, session_id: str, tool_call_id: str, app_name: str, user_id: str):
+        """Give a pending client tool call tool_timeout_seconds to be answered."""
+        key = (session_id, tool_call_id)
+        if not self._tool_timeout or key in self._tool_call_deadlines:
+            return
+        def on_deadline():
+            task = asyncio.ensure_future(self._expire_tool_calls(session_id, app_name, user_id))
+            self._expiry_tasks.add(task)
+            task.add_done_callback(self._expiry_tasks.discard)
+        self._tool_call_deadlines[key] = self._deadlines.schedule(self._tool_timeout, on_deadline)
+    
+    async def _expire_tool_calls(self, session_id: str, app_name: str, user_id: str):
+        """Answer a thread's abandoned client tool calls with timeout results and release their resources.
 
-                # Remove tool call if present
-                if tool_call_id in pending_calls:
-                    pending_calls.remove(tool_call_id)
-
-                    # Update the state using SessionManager
-                    success = await self._session_manager.set_state_value(
-                        session_id=session_id,
-                        app_name=app_name,
-                        user_id=user_id,
-                        key="pending_tool_calls",
-                        value=pending_calls
-                    )
-                    
-                    if success:
-                        logger.info(f"Removed tool call {tool_call_id} from session {session_id} pending list")
+        Every pending call of the thread whose deadline has passed, or falls within
+        TOOL_TIMEOUT_BATCH_SECONDS, is answered in a single user event.
+        """
+        cutoff = asyncio.get_running_loop().time() + TOOL_TIMEOUT_BATCH_SECONDS
+        responses = []
+        for tool_call_id in self._pending_calls.get_pending(session_id):
+            deadline = self._tool_call_deadlines.get((session_id, tool_call_id))
+            if deadline is None or deadline.when > cutoff:
+                continue
+            tool_name = self._pending_calls.tool_name(session_id, tool_call_id) or "unknown"
+            self._remove_pending_tool_call(session_id, tool_call_id)
+            self._expired_tool_calls[(session_id, tool_call_id)] = None
+            responses.append(types.Part(
+                function_response=types.FunctionResponse(
+                    id=tool_call_id,
+                    name=tool_name,
+                    response=tool_timeout_result(tool_name, self._tool_timeout)
+                )
+            ))
+        if not responses:
+            # Already answered, or expired along with another call
+            return
+        while len(self._expired_tool_calls) > 1024:
+            self._expired_tool_calls.popitem(last=False)
+        expired_ids = [part.function_response.id for part in responses]
+        logger.warning(f"Tool calls {expired_ids} of thread {session_id} expired after {self._tool_timeout}s")
+        
+        try:
+            # Answer the calls in the conversation so the model sees what happened
+            session_service = self._session_manager._session_service
+            session = await session_service.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            if session is not None:
+                await session_service.append_event(session, Event(
+                    invocation_id=f"tool_timeout_{expired_ids[0]}",
+                    author="user",
+                    content=types.Content(role="user", parts=responses)
+                ))
+            await self._pending_calls.flush(session_id, app_name, user_id)
         except Exception as e:
-            logger.error(f"Failed to remove pending tool call {tool_call_id} from session {session_id}: {e}")
+            logger.error(f"Failed to record timeout of tool calls {expired_ids} in thread {session_id}: {e}")
+        
+        async with self._execution_lock:
+            execution = self._active_executions.get(session_id)
+            if execution is not None and execution.is_complete and not self._has_pending_tool_calls(session_id):
+                del self._active_executions[session_id]
+                logger.debug(f"Released execution for thread {session_id} after tool call timeout")
     
-    async def _has_pending_tool_calls(self, session_id: str) -> bool:
+    def _has_pending_tool_calls(self, session_id: str) -> bool:
         """Check if session has pending tool calls (HITL scenario).
 
         Args:
@@ -293,27 +359,14 @@ class ADKAgent:
         Returns:
             True if session has pending tool calls
         """
+        return self._pending_calls.has_pending(session_id)
+    
+    async def _flush_pending_tool_calls(self, input: RunAgentInput):
+        """Write a thread's pending tool calls to session state if they changed during the run."""
         try:
-            # Use efficient session metadata lookup
-            metadata = self._get_session_metadata(session_id)
-
-            if metadata:
-                app_name = metadata["app_name"]
-                user_id = metadata["user_id"]
-
-                # Get pending calls using SessionManager
-                pending_calls = await self._session_manager.get_state_value(
-                    session_id=session_id,
-                    app_name=app_name,
-                    user_id=user_id,
-                    key="pending_tool_calls",
-                    default=[]
-                )
-                return len(pending_calls) > 0
+            await self._pending_calls.flush(input.thread_id, self._get_app_name(input), self._get_user_id(input))
         except Exception as e:
-            logger.error(f"Failed to check pending tool calls for session {session_id}: {e}")
-
-        return False
+            logger.error(f"Failed to persist pending tool calls for session {input.thread_id}: {e}")
     
     
     def _default_run_config(self, input: RunAgentInput) -> ADKRunConfig:
@@ -348,6 +401,14 @@ class ADKAgent:
         Yields:
             AG-UI protocol events
         """
+        # Recover the thread's pending tool calls (kept in memory after the first run)
+        app_name = self._get_app_name(input)
+        user_id = self._get_user_id(input)
+        await self._pending_calls.load(input.thread_id, app_name, user_id)
+        for tool_call_id in self._pending_calls.get_pending(input.thread_id):
+            # Calls recovered after a restart get a fresh deadline
+            self._schedule_tool_call_deadline(input.thread_id, tool_call_id, app_name, user_id)
+        
         # Check if this is a tool result submission for an existing execution
         if self._is_tool_result_submission(input):
             # Handle tool results for existing execution
@@ -369,12 +430,6 @@ class ADKAgent:
                 initial_state=initial_state
             )
 
-            # Update session lookup cache for efficient session ID to metadata mapping
-            self._session_lookup_cache[session_id] = {
-                "app_name": app_name,
-                "user_id": user_id
-            }
-
             logger.debug(f"Session ready: {session_id} for user: {user_id}")
             return adk_session
         except Exception as e:
@@ -439,26 +494,38 @@ class ADKAgent:
             )
             return
         
+        expired = [
+            tool_result['message'].tool_call_id for tool_result in tool_results
+            if (thread_id, tool_result['message'].tool_call_id) in self._expired_tool_calls
+        ]
+        if expired:
+            logger.warning(f"Rejecting results for expired tool calls {expired} in thread {thread_id}")
+            yield RunErrorEvent(
+                type=EventType.RUN_ERROR,
+                message=f"Tool call {', '.join(expired)} expired after {self._tool_timeout} seconds",
+                code="TOOL_CALL_EXPIRED"
+            )
+            return
+        
         try:
             # Check if tool result matches any pending tool calls for better debugging
             for tool_result in tool_results:
                 tool_call_id = tool_result['message'].tool_call_id
-                has_pending = await self._has_pending_tool_calls(thread_id)
                 
-                if has_pending:
-                    # Could add more specific check here for the exact tool_call_id
-                    # but for now just log that we're processing a tool result while tools are pending
+                # Remove from pending tool calls now that we're processing it
+                if self._remove_pending_tool_call(thread_id, tool_call_id):
                     logger.debug(f"Processing tool result {tool_call_id} for thread {thread_id} with pending tools")
-                    # Remove from pending tool calls now that we're processing it
-                    await self._remove_pending_tool_call(thread_id, tool_call_id)
                 else:
                     # No pending tools - this could be a stale result or from a different session
                     logger.warning(f"No pending tool calls found for tool result {tool_call_id} in thread {thread_id}")
             
+            # Persist the answered calls before the run reads session state
+            await self._flush_pending_tool_calls(input)
+            
             # Since all tools are long-running, all tool results are standalone
             # and should start new executions with the tool results
-            logger.info(f"Starting new execution for tool result in thread {thread_id}")
-            async for event in self._start_new_execution(input):
+            logger.info(f"Starting new execution for {len(tool_results)} tool result(s) in thread {thread_id}")
+            async for event in self._start_new_execution(input, tool_results):
                 yield event
                 
         except Exception as e:
@@ -472,14 +539,19 @@ class ADKAgent:
     async def _extract_tool_results(self, input: RunAgentInput) -> List[Dict]:
         """Extract tool messages with their names from input.
         
-        Only extracts the most recent tool message to avoid accumulation issues
-        where multiple tool results are sent to the LLM causing API errors.
+        Every tool message answering one of the thread's pending tool calls
+        is returned (the last answer per call, in message order), so a client
+        answering several HITL calls at once continues the conversation with
+        a single run. Tool messages answering calls that are no longer
+        pending are skipped, so earlier answers still present in the message
+        history aren't sent to the LLM again. Without any match, only the
+        most recent tool message is returned.
         
         Args:
             input: The run input
             
         Returns:
-            List of dicts containing tool name and message (single item for most recent)
+            List of dicts containing tool name and message
         """
         # Create a mapping of tool_call_id to tool name
         tool_call_map = {}
@@ -488,25 +560,36 @@ class ADKAgent:
                 for tool_call in message.tool_calls:
                     tool_call_map[tool_call.id] = tool_call.function.name
         
-        # Find the most recent tool message (should be the last one in a tool result submission)
-        most_recent_tool_message = None
-        for message in reversed(input.messages):
-            if hasattr(message, 'role') and message.role == "tool":
-                most_recent_tool_message = message
-                break
+        tool_messages = [
+            message for message in input.messages
+            if hasattr(message, 'role') and message.role == "tool"
+        ]
+        if not tool_messages:
+            return []
         
-        if most_recent_tool_message:
-            tool_name = tool_call_map.get(most_recent_tool_message.tool_call_id, "unknown")
-            
-            # Debug: Log the extracted tool message
-            logger.debug(f"Extracted most recent ToolMessage: role={most_recent_tool_message.role}, tool_call_id={most_recent_tool_message.tool_call_id}, content='{most_recent_tool_message.content}'")
-            
-            return [{
+        answers = {}
+        for message in tool_messages:
+            if self._pending_calls.is_pending(input.thread_id, message.tool_call_id):
+                answers.pop(message.tool_call_id, None)
+                answers[message.tool_call_id] = message
+        if not answers:
+            # Nothing pending matches (e.g. state was lost); use the most recent tool message
+            most_recent_tool_message = tool_messages[-1]
+            answers[most_recent_tool_message.tool_call_id] = most_recent_tool_message
+        
+        results = []
+        for tool_call_id, message in answers.items():
+            # Incremental submissions don't carry the assistant message with the call
+            tool_name = tool_call_map.get(tool_call_id) or self._pending_calls.tool_name(input.thread_id, tool_call_id) or "unknown"
+            logger.debug(f"Extracted ToolMessage: tool_call_id={tool_call_id}, content='{message.content}'")
+            results.append({
                 'tool_name': tool_name,
-                'message': most_recent_tool_message
-            }]
+                'message': message
+            })
         
-        return []
+        if len(results) > 1:
+            logger.info(f"Batching {len(results)} tool results into one run for thread {input.thread_id}")
+        return results
     
     async def _stream_events(
         self, 
@@ -522,75 +605,62 @@ class ADKAgent:
         """
         logger.debug(f"Starting _stream_events for thread {execution.thread_id}, queue ID: {id(execution.event_queue)}")
         event_count = 0
-        timeout_count = 0
+        queue = execution.event_queue
         
+        # The task's done-callback queues a None sentinel (or, if the queue is
+        # full, we find the task done once it is drained), and the execution
+        # timeout is enforced by the shared deadline scheduler cancelling the task
         while True:
-            try:
-                logger.debug(f"Waiting for event from queue (thread {execution.thread_id}, queue size: {execution.event_queue.qsize()})")
-                
-                # Wait for event with timeout
-                event = await asyncio.wait_for(
-                    execution.event_queue.get(),
-                    timeout=1.0  # Check every second
-                )
-                
-                event_count += 1
-                logger.debug(f"Got event #{event_count} from queue: {type(event).__name__ if event else 'None'} (thread {execution.thread_id})")
-                
-                if event is None:
-                    # Execution complete
-                    execution.is_complete = True
-                    logger.debug(f"Execution complete for thread {execution.thread_id} after {event_count} events")
-                    break
-                
-                logger.debug(f"Streaming event #{event_count}: {type(event).__name__} (thread {execution.thread_id})")
-                yield event
-                
-            except asyncio.TimeoutError:
-                timeout_count += 1
-                logger.debug(f"Timeout #{timeout_count} waiting for events (thread {execution.thread_id}, task done: {execution.task.done()}, queue size: {execution.event_queue.qsize()})")
-                
-                # Check if execution is stale
-                if execution.is_stale(self._execution_timeout):
-                    logger.error(f"Execution timed out for thread {execution.thread_id}")
-                    yield RunErrorEvent(
-                        type=EventType.RUN_ERROR,
-                        message="Execution timed out",
-                        code="EXECUTION_TIMEOUT"
-                    )
-                    break
-                
-                # Check if task is done
-                if execution.task.done():
-                    # Task completed but didn't send None
-                    execution.is_complete = True
-                    try:
-                        task_result = execution.task.result()
-                        logger.debug(f"Task completed with result: {task_result} (thread {execution.thread_id})")
-                    except Exception as e:
-                        logger.debug(f"Task completed with exception: {e} (thread {execution.thread_id})")
-                    
-                    # Wait a bit more in case there are events still coming
-                    logger.debug(f"Task done but no None signal - checking queue one more time (thread {execution.thread_id}, queue size: {execution.event_queue.qsize()})")
-                    if execution.event_queue.qsize() > 0:
-                        logger.debug(f"Found {execution.event_queue.qsize()} events in queue after task completion, continuing...")
-                        continue
-                    
-                    logger.debug(f"Task completed without sending None signal (thread {execution.thread_id})")
-                    break
+            if execution.task.done() and queue.empty():
+                logger.debug(f"Task completed without sending None signal (thread {execution.thread_id})")
+                break
+            
+            logger.debug("Waiting for event from queue (thread %s, queue size: %d)", execution.thread_id, queue.qsize())
+            event = await queue.get()
+            
+            event_count += 1
+            logger.debug("Got event #%d from queue: %s (thread %s)", event_count, type(event).__name__, execution.thread_id)
+            
+            if event is None:
+                # Execution complete
+                logger.debug(f"Execution complete for thread {execution.thread_id} after {event_count} events")
+                break
+            
+            logger.debug("Streaming event #%d: %s (thread %s)", event_count, type(event).__name__, execution.thread_id)
+            yield event
+        
+        execution.is_complete = True
+        if execution.timed_out:
+            logger.error(f"Execution timed out for thread {execution.thread_id}")
+            yield RunErrorEvent(
+                type=EventType.RUN_ERROR,
+                message="Execution timed out",
+                code="EXECUTION_TIMEOUT"
+            )
+    
+    def _on_execution_timeout(self, execution: ExecutionState):
+        """Deadline callback: cancel a run that exceeded the execution timeout."""
+        if execution.task.done():
+            return
+        execution.timed_out = True
+        execution.task.cancel()
     
     async def _start_new_execution(
         self, 
-        input: RunAgentInput
+        input: RunAgentInput,
+        tool_results: Optional[List[Dict]] = None
     ) -> AsyncGenerator[BaseEvent, None]:
         """Start a new ADK execution with tool support.
         
         Args:
             input: The run input
+            tool_results: Tool results submitted with the input, from _extract_tool_results
             
         Yields:
             AG-UI events from the execution
         """
+        execution = None
+        ticket = None
         try:
             # Emit RUN_STARTED
             logger.debug(f"Emitting RUN_STARTED for thread {input.thread_id}, run {input.run_id}")
@@ -600,17 +670,32 @@ class ADKAgent:
                 run_id=input.run_id
             )
             
-            # Check concurrent execution limit
+            # Clean up stale executions so their runs give back their slots
             async with self._execution_lock:
                 if len(self._active_executions) >= self._max_concurrent:
-                    # Clean up stale executions
                     await self._cleanup_stale_executions()
-                    
-                    if len(self._active_executions) >= self._max_concurrent:
-                        raise RuntimeError(
-                            f"Maximum concurrent executions ({self._max_concurrent}) reached"
-                        )
-                
+
+            # Wait for an execution slot, fairly across users
+            ticket = self._admission.enqueue(
+                self._get_user_id(input), self._get_priority(input), thread_id=input.thread_id
+            )
+            async for position in self._admission.wait(ticket):
+                logger.debug("Run %s for thread %s queued at position %d", input.run_id, input.thread_id, position)
+                yield CustomEvent(
+                    type=EventType.CUSTOM,
+                    name="queue_position",
+                    value={"position": position, "waiting": self._admission.get_stats()["waiting"]}
+                )
+            if not ticket.admitted:
+                # Withdrawn by cancel_execution while still queued
+                yield RunErrorEvent(
+                    type=EventType.RUN_ERROR,
+                    message="Run was cancelled before it started",
+                    code="RUN_CANCELLED"
+                )
+                return
+
+            async with self._execution_lock:
                 # Check if there's an existing execution for this thread and wait for it
                 existing_execution = self._active_executions.get(input.thread_id)
 
@@ -623,7 +708,7 @@ class ADKAgent:
                     logger.debug(f"Previous execution completed with error: {e}")
             
             # Start background execution
-            execution = await self._start_background_execution(input)
+            execution = await self._start_background_execution(input, tool_results)
             
             # Store execution (replacing any previous one)
             async with self._execution_lock:
@@ -633,10 +718,14 @@ class ADKAgent:
             logger.debug(f"Starting to stream events for execution {execution.thread_id}")
             has_tool_calls = False
             tool_call_ids = []
+            tool_call_names = {}
             
             logger.debug(f"About to iterate over _stream_events for execution {execution.thread_id}")
             async for event in self._stream_events(execution):
                 # Track tool calls for HITL scenarios
+                if isinstance(event, ToolCallStartEvent):
+                    tool_call_names[event.tool_call_id] = event.tool_call_name
+
                 if isinstance(event, ToolCallEndEvent):
                     logger.info(f"Detected ToolCallEndEvent with id: {event.tool_call_id}")
                     has_tool_calls = True
@@ -649,7 +738,7 @@ class ADKAgent:
                     tool_call_ids.remove(event.tool_call_id)
                 
                 
-                logger.debug(f"Yielding event: {type(event).__name__}")
+                logger.debug("Yielding event: %s", type(event).__name__)
                 yield event
                 
             logger.debug(f"Finished iterating over _stream_events for execution {execution.thread_id}")
@@ -660,7 +749,8 @@ class ADKAgent:
                 user_id = self._get_user_id(input)
                 for tool_call_id in tool_call_ids:
                     await self._add_pending_tool_call_with_context(
-                        execution.thread_id, tool_call_id, app_name, user_id
+                        execution.thread_id, tool_call_id, app_name, user_id,
+                        tool_name=tool_call_names.get(tool_call_id)
                     )
             logger.debug(f"Finished streaming events for execution {execution.thread_id}")
             
@@ -680,38 +770,135 @@ class ADKAgent:
                 code="EXECUTION_ERROR"
             )
         finally:
+            if ticket is not None:
+                self._admission.release(ticket)
+
             # Clean up execution if complete and no pending tool calls (HITL scenarios)
+            abandoned = None
             async with self._execution_lock:
                 if input.thread_id in self._active_executions:
-                    execution = self._active_executions[input.thread_id]
-                    execution.is_complete = True
+                    current = self._active_executions[input.thread_id]
+                    current.is_complete = True
                     
                     # Check if session has pending tool calls before cleanup
-                    has_pending = await self._has_pending_tool_calls(input.thread_id)
+                    has_pending = self._has_pending_tool_calls(input.thread_id)
                     if not has_pending:
                         del self._active_executions[input.thread_id]
+                        # The consumer went away early; don't leave the run blocked on a full queue
+                        if current is execution and not execution.task.done():
+                            abandoned = execution
                         logger.debug(f"Cleaned up execution for thread {input.thread_id}")
                     else:
                         logger.info(f"Preserving execution for thread {input.thread_id} - has pending tool calls (HITL scenario)")
+            if abandoned is not None:
+                await abandoned.cancel()
+            
+            # One session state write per run for the pending tool calls
+            await self._flush_pending_tool_calls(input)
     
     async def _start_background_execution(
         self, 
-        input: RunAgentInput
+        input: RunAgentInput,
+        tool_results: Optional[List[Dict]] = None
     ) -> ExecutionState:
         """Start ADK execution in background with tool support.
         
         Args:
             input: The run input
+            tool_results: Tool results submitted with the input
             
         Returns:
             ExecutionState tracking the background execution
         """
-        event_queue = asyncio.Queue()
+        event_queue = asyncio.Queue(maxsize=self._max_queued_events)
         logger.debug(f"Created event queue {id(event_queue)} for thread {input.thread_id}")
         # Extract necessary information
         user_id = self._get_user_id(input)
         app_name = self._get_app_name(input)
         
+        # Agents prepared with the same SystemMessage and client tools are reused
+        # together with their runner
+        system_content = None
+        if input.messages and isinstance(input.messages[0], SystemMessage):
+            system_content = input.messages[0].content or None
+        client_tools = self._get_client_tools(input)
+        
+        cache_key = runner_fingerprint(app_name, self._adk_agent, system_content, client_tools)
+        runner = self._runner_cache.get(cache_key)
+        if runner is None:
+            adk_agent = self._prepare_agent(system_content, client_tools)
+            runner = self._create_runner(
+                adk_agent=adk_agent,
+                user_id=user_id,
+                app_name=app_name
+            )
+            self._runner_cache.put(cache_key, runner)
+        else:
+            logger.debug(f"Reusing cached runner for thread {input.thread_id}")
+        
+        # Create background task
+        logger.debug(f"Creating background task for thread {input.thread_id}")
+        task = asyncio.create_task(
+            self._run_adk_in_background(
+                input=input,
+                runner=runner,
+                user_id=user_id,
+                app_name=app_name,
+                event_queue=event_queue,
+                tool_results=tool_results
+            )
+        )
+        logger.debug(f"Background task created for thread {input.thread_id}: {task}")
+        
+        execution = ExecutionState(
+            task=task,
+            thread_id=input.thread_id,
+            event_queue=event_queue
+        )
+        execution.deadline = self._deadlines.schedule(
+            self._execution_timeout,
+            lambda: self._on_execution_timeout(execution)
+        )
+        return execution
+    
+    def _get_client_tools(self, input: RunAgentInput) -> Optional[List[Any]]:
+        """Client-side tools of a run that the agent doesn't already provide.
+        
+        Returns:
+            The AG-UI tools to proxy, or None if the run has no tools
+        """
+        if not input.tools:
+            return None
+        
+        # Get existing tools from the agent
+        existing_tools = []
+        if hasattr(self._adk_agent, 'tools') and self._adk_agent.tools:
+            existing_tools = list(self._adk_agent.tools) if isinstance(self._adk_agent.tools, (list, tuple)) else [self._adk_agent.tools]
+        
+        # if same tool is defined in frontend and backend then agent will only use the backend tool
+        input_tools = []
+        for input_tool in input.tools:
+            # Check if this input tool's name matches any existing tool
+            # Also exclude this specific tool call "transfer_to_agent" which is used internally by the adk to handoff to other agents
+            if (not any(hasattr(existing_tool, '__name__') and input_tool.name == existing_tool.__name__
+                    for existing_tool in existing_tools) and input_tool.name != 'transfer_to_agent'):
+                input_tools.append(input_tool)
+        return input_tools
+    
+    def _prepare_agent(
+        self,
+        system_content: Optional[str],
+        client_tools: Optional[List[Any]]
+    ) -> BaseAgent:
+        """Copy the ADK agent with a SystemMessage and client-side tools applied.
+        
+        Args:
+            system_content: SystemMessage to append to the agent instructions
+            client_tools: AG-UI tools to expose through a ClientProxyToolset
+            
+        Returns:
+            The prepared agent (the original agent if nothing needs changing)
+        """
         # Use the ADK agent directly
         adk_agent = self._adk_agent
         
@@ -719,66 +906,61 @@ class ADKAgent:
         agent_updates = {}
         
         # Handle SystemMessage if it's the first message - append to agent instructions
-        if input.messages and isinstance(input.messages[0], SystemMessage):
-            system_content = input.messages[0].content
-            if system_content:
-                current_instruction = getattr(adk_agent, 'instruction', '') or ''
-
-                if callable(current_instruction):
-                    # Handle instructions provider
-                    if inspect.iscoroutinefunction(current_instruction):
-                        # Async instruction provider
-                        async def instruction_provider_wrapper_async(*args, **kwargs):
-                            instructions = system_content
-                            original_instructions = await current_instruction(*args, **kwargs) or ''
-                            if original_instructions:
-                                instructions = f"{original_instructions}\n\n{instructions}"
-                            return instructions
-                        new_instruction = instruction_provider_wrapper_async
-                    else:
-                        # Sync instruction provider
-                        def instruction_provider_wrapper_sync(*args, **kwargs):
-                            instructions = system_content
-                            original_instructions = current_instruction(*args, **kwargs) or ''
-                            if original_instructions:
-                                instructions = f"{original_instructions}\n\n{instructions}"
-                            return instructions
-                        new_instruction = instruction_provider_wrapper_sync
-
-                    logger.debug(
-                        f"Will wrap callable InstructionProvider and append SystemMessage: '{system_content[:100]}...'")
+        if system_content:
+            current_instruction = getattr(adk_agent, 'instruction', '') or ''
+
+            if callable(current_instruction):
+                # Handle instructions provider
+                if inspect.iscoroutinefunction(current_instruction):
+                    # Async instruction provider
+                    async def instruction_provider_wrapper_async(*args, **kwargs):
+                        instructions = system_content
+                        original_instructions = await current_instruction(*args, **kwargs) or ''
+                        if original_instructions:
+                            instructions = f"{original_instructions}\n\n{instructions}"
+                        return instructions
+                    new_instruction = instruction_provider_wrapper_async
                 else:
-                    # Handle string instructions
-                    if current_instruction:
-                        new_instruction = f"{current_instruction}\n\n{system_content}"
-                    else:
-                        new_instruction = system_content
-                    logger.debug(f"Will append SystemMessage to string instructions: '{system_content[:100]}...'")
+                    # Sync instruction provider
+                    def instruction_provider_wrapper_sync(*args, **kwargs):
+                        instructions = system_content
+                        original_instructions = current_instruction(*args, **kwargs) or ''
+                        if original_instructions:
+                            instructions = f"{original_instructions}\n\n{instructions}"
+                        return instructions
+                    new_instruction = instruction_provider_wrapper_sync
+
+                logger.debug(
+                    f"Will wrap callable InstructionProvider and append SystemMessage: '{system_content[:100]}...'")
+            else:
+                # Handle string instructions
+                if current_instruction:
+                    new_instruction = f"{current_instruction}\n\n{system_content}"
+                else:
+                    new_instruction = system_content
+                logger.debug(f"Will append SystemMessage to string instructions: '{system_content[:100]}...'")
+
+            agent_updates['instruction'] = new_instruction
+
+        existing_tools = []
+        if hasattr(adk_agent, 'tools') and adk_agent.tools:
+            existing_tools = list(adk_agent.tools) if isinstance(adk_agent.tools, (list, tuple)) else [adk_agent.tools]
+        if self._tool_timeout and existing_tools:
+            # Backend function tools give up after tool_timeout_seconds
+            existing_tools = with_tool_timeouts(existing_tools, self._tool_timeout)
+            agent_updates['tools'] = existing_tools
 
-                agent_updates['instruction'] = new_instruction
+        if self._context_compactor and hasattr(adk_agent, 'before_model_callback'):
+            # Runs after the agent's own callbacks, on the request they leave
+            callbacks = adk_agent.before_model_callback or []
+            if not isinstance(callbacks, list):
+                callbacks = [callbacks]
+            agent_updates['before_model_callback'] = callbacks + [self._context_compactor]
 
         # Create dynamic toolset if tools provided and prepare tool updates
-        toolset = None
-        if input.tools:
-            
-            # Get existing tools from the agent
-            existing_tools = []
-            if hasattr(adk_agent, 'tools') and adk_agent.tools:
-                existing_tools = list(adk_agent.tools) if isinstance(adk_agent.tools, (list, tuple)) else [adk_agent.tools]
-            
-            # if same tool is defined in frontend and backend then agent will only use the backend tool
-            input_tools = []
-            for input_tool in input.tools:
-                # Check if this input tool's name matches any existing tool
-                # Also exclude this specific tool call "transfer_to_agent" which is used internally by the adk to handoff to other agents
-                if (not any(hasattr(existing_tool, '__name__') and input_tool.name == existing_tool.__name__
-                        for existing_tool in existing_tools) and input_tool.name != 'transfer_to_agent'):
-                    input_tools.append(input_tool)
-                        
-            toolset = ClientProxyToolset(
-                ag_ui_tools=input_tools,
-                event_queue=event_queue
-            )
+        if client_tools is not None:
+            # The toolset picks up each run's event queue from the running task
+            toolset = ClientProxyToolset(ag_ui_tools=client_tools)
 
             # Combine existing tools with our proxy toolset
             combined_tools = existing_tools + [toolset]
@@ -789,65 +971,50 @@ class ADKAgent:
         if agent_updates:
             adk_agent = adk_agent.model_copy(update=agent_updates)
             logger.debug(f"Created modified agent copy with updates: {list(agent_updates.keys())}")
-        
-        # Create background task
-        logger.debug(f"Creating background task for thread {input.thread_id}")
-        task = asyncio.create_task(
-            self._run_adk_in_background(
-                input=input,
-                adk_agent=adk_agent,
-                user_id=user_id,
-                app_name=app_name,
-                event_queue=event_queue
-            )
-        )
-        logger.debug(f"Background task created for thread {input.thread_id}: {task}")
-        
-        return ExecutionState(
-            task=task,
-            thread_id=input.thread_id,
-            event_queue=event_queue
-        )
+        return adk_agent
     
     async def _run_adk_in_background(
         self,
         input: RunAgentInput,
-        adk_agent: BaseAgent,
+        runner: Runner,
         user_id: str,
         app_name: str,
-        event_queue: asyncio.Queue
+        event_queue: asyncio.Queue,
+        tool_results: Optional[List[Dict]] = None
     ):
         """Run ADK agent in background, emitting events to queue.
         
         Args:
             input: The run input
-            adk_agent: The ADK agent to run (already prepared with tools and SystemMessage)
+            runner: Runner for the agent (already prepared with tools and SystemMessage)
             user_id: User ID
             app_name: App name
             event_queue: Queue for emitting events
+            tool_results: Tool results to answer pending calls with, all in one message
         """
         try:
-            # Agent is already prepared with tools and SystemMessage instructions (if any)
-            # from _start_background_execution, so no additional agent copying needed here
-            
-            # Create runner
-            runner = self._create_runner(
-                adk_agent=adk_agent,
-                user_id=user_id,
-                app_name=app_name
-            )
+            # The runner's agent is already prepared with tools and SystemMessage
+            # instructions (if any) and may be shared with other runs; client proxy
+            # tools find this run's queue through the task's context
+            current_event_queue.set(event_queue)
             
             # Create RunConfig
             run_config = self._run_config_factory(input)
+            if self._tool_thread_pool_workers and run_config.tool_thread_pool_config is None:
+                # ADK gathers the calls of a turn; sync tools need the pool to overlap
+                run_config = run_config.model_copy(update={
+                    'tool_thread_pool_config': ToolThreadPoolConfig(max_workers=self._tool_thread_pool_workers)
+                })
             
             # Ensure session exists
             await self._ensure_session_exists(
                 app_name, user_id, input.thread_id, input.state
             )
 
-            # this will always update the backend states with the frontend states
+            # Sync the backend states with the frontend states, writing only the keys that changed
             # Recipe Demo Example: if there is a state "salt" in the ingredients state and in frontend user remove this salt state using UI from the ingredients list then our backend should also update these state changes as well to sync both the states
-            await self._session_manager.update_session_state(input.thread_id,app_name,user_id,input.state)
+            await self._session_manager.sync_session_state(input.thread_id, app_name, user_id, input.state)
+            self._acknowledge_client_state(input.thread_id, input.state)
             
             
             # Convert messages
@@ -856,7 +1023,8 @@ class ADKAgent:
             
             # if there is a tool response submission by the user then we need to only pass the tool response to the adk runner
             if self._is_tool_result_submission(input):
-                tool_results = await self._extract_tool_results(input)
+                if tool_results is None:
+                    tool_results = await self._extract_tool_results(input)
                 parts = []
                 for tool_msg in tool_results:
                     tool_call_id = tool_msg['message'].tool_call_id
@@ -916,9 +1084,10 @@ class ADKAgent:
                         input.run_id
                     ):
                         
-                        logger.debug(f"Emitting event to queue: {type(ag_ui_event).__name__} (thread {input.thread_id}, queue size before: {event_queue.qsize()})")
+                        if ag_ui_event.type == EventType.STATE_DELTA:
+                            self._apply_to_state_baseline(input.thread_id, ag_ui_event.delta)
                         await event_queue.put(ag_ui_event)
-                        logger.debug(f"Event queued: {type(ag_ui_event).__name__} (thread {input.thread_id}, queue size after: {event_queue.qsize()})")
+                        logger.debug("Event queued: %s (thread %s, queue size after: %d)", type(ag_ui_event).__name__, input.thread_id, event_queue.qsize())
                 else:
                     # LongRunning Tool events are usually emmitted in final response                   
                     async for ag_ui_event in event_translator.translate_lro_function_calls(
@@ -927,7 +1096,7 @@ class ADKAgent:
                         await event_queue.put(ag_ui_event)
                         if ag_ui_event.type == EventType.TOOL_CALL_END:
                             is_long_running_tool = True
-                        logger.debug(f"Event queued: {type(ag_ui_event).__name__} (thread {input.thread_id}, queue size after: {event_queue.qsize()})")
+                        logger.debug("Event queued: %s (thread %s, queue size after: %d)", type(ag_ui_event).__name__, input.thread_id, event_queue.qsize())
                     # hard stop the execution if we find any long running tool
                     if is_long_running_tool:
                         return
@@ -936,8 +1105,8 @@ class ADKAgent:
                 await event_queue.put(ag_ui_event)
             # moving states snapshot events after the text event clousure to avoid this error https://github.com/Contextable/ag-ui/issues/28
             final_state = await self._session_manager.get_session_state(input.thread_id,app_name,user_id)
-            if final_state:
-                ag_ui_event =  event_translator._create_state_snapshot_event(final_state)                    
+            ag_ui_event = self._final_state_event(input, final_state, event_translator)
+            if ag_ui_event:
                 await event_queue.put(ag_ui_event)
             # Signal completion - ADK execution is done
             logger.debug(f"Background task sending completion signal for thread {input.thread_id}")
@@ -974,6 +1143,119 @@ class ADKAgent:
             await execution.cancel()
             logger.info(f"Cleaned up stale execution for thread {thread_id}")
 
+    async def cancel_execution(self, thread_id: str) -> bool:
+        """Cancel the in-flight ADK run for a thread, e.g. when its client went away.
+
+        Runs of the thread still waiting for an execution slot are withdrawn
+        from the admission queue too. Pending HITL tool calls are left in
+        session state, so a later tool result submission can still continue
+        the conversation.
+
+        Args:
+            thread_id: The thread whose execution should be cancelled
+
+        Returns:
+            True if a running execution was cancelled or a queued run withdrawn
+        """
+        withdrawn = self._admission.withdraw_thread(thread_id)
+
+        async with self._execution_lock:
+            execution = self._active_executions.get(thread_id)
+
+        if execution is None or execution.task.done():
+            return withdrawn > 0
+
+        await execution.cancel()
+        return True
+
+    def get_runner_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics of the prepared agent and runner cache."""
+        return self._runner_cache.get_stats()
+
+    def invalidate_runner_cache(self):
+        """Forget all prepared agents and runners, e.g. after changing the agent or its services."""
+        self._runner_cache.invalidate()
+
+    def _final_state_event(
+        self,
+        input: RunAgentInput,
+        final_state: Optional[Dict[str, Any]],
+        event_translator: EventTranslator
+    ) -> Optional[BaseEvent]:
+        """State event ending a run: a patch against the state last sent, else a snapshot.
+
+        Returns:
+            STATE_DELTA with the changes, STATE_SNAPSHOT if the thread has no
+            baseline or the client asked for a resync, or None if there is
+            nothing to send
+        """
+        if final_state is None:
+            return None
+
+        thread_id = input.thread_id
+        baseline = self._state_baselines.pop(thread_id, None)
+        # Tool names of pending calls are only needed server side
+        final_state = {key: value for key, value in final_state.items() if key != PENDING_NAMES_KEY}
+        if baseline is None and not final_state:
+            return None
+
+        final_state = copy.deepcopy(final_state)
+        self._state_baselines[thread_id] = final_state
+        while len(self._state_baselines) > self._max_state_baselines:
+            self._state_baselines.popitem(last=False)
+
+        if baseline is None or self._wants_state_resync(input):
+            self._state_snapshots_sent += 1
+            return event_translator._create_state_snapshot_event(final_state)
+
+        patch = make_patch(baseline, final_state)
+        if not patch:
+            return None
+        self._state_deltas_sent += 1
+        return StateDeltaEvent(type=EventType.STATE_DELTA, delta=patch)
+
+    def _acknowledge_client_state(self, thread_id: str, state: Optional[Dict[str, Any]]):
+        """Take the state a client sent as the state it holds, so the next patch is made against it.
+
+        Keys the client dropped are gone from the baseline too, so the patch
+        adds them back if the session still has them. An empty state means the
+        client sent none (as for sync_session_state) and keeps the baseline.
+        """
+        if thread_id in self._state_baselines and isinstance(state, dict) and state:
+            self._state_baselines[thread_id] = copy.deepcopy(state)
+
+    def _apply_to_state_baseline(self, thread_id: str, patch: List[Dict[str, Any]]):
+        """Keep a thread's baseline in step with a STATE_DELTA sent during the run."""
+        baseline = self._state_baselines.get(thread_id)
+        if baseline is None:
+            return
+        try:
+            self._state_baselines[thread_id] = apply_patch(baseline, patch)
+        except JsonPatchError as e:
+            # Fall back to a snapshot at the end of the run
+            logger.debug(f"Dropping state baseline of thread {thread_id}: {e}")
+            self._state_baselines.pop(thread_id, None)
+
+    def reset_state_baseline(self, thread_id: str):
+        """Send the next run of a thread a full state snapshot, e.g. after its client lost events."""
+        self._state_baselines.pop(thread_id, None)
+
+    def get_state_emission_stats(self) -> Dict[str, Any]:
+        """Counts of end-of-run state snapshots and JSON Patch deltas sent."""
+        return {
+            "baselines": len(self._state_baselines),
+            "snapshots": self._state_snapshots_sent,
+            "deltas": self._state_deltas_sent
+        }
+
+    def get_admission_stats(self) -> Dict[str, Any]:
+        """Execution slot usage and wait queue statistics."""
+        return self._admission.get_stats()
+
+    def get_context_compaction_stats(self) -> Dict[str, Any]:
+        """Prompt tokens saved by the context compactor (empty without one)."""
+        return self._context_compactor.get_compaction_stats() if self._context_compactor else {}
+
     async def close(self):
         """Clean up resources including active executions."""
         # Cancel all active executions
@@ -982,8 +1264,12 @@ class ADKAgent:
                 await execution.cancel()
             self._active_executions.clear()
 
-        # Clear session lookup cache
-        self._session_lookup_cache.clear()
+        self._runner_cache.invalidate()
+        self._pending_calls.clear()
+        for deadline in self._tool_call_deadlines.values():
+            deadline.cancel()
+        self._tool_call_deadlines.clear()
+        self._state_baselines.clear()
 
         # Stop session manager cleanup task
         await self._session_manager.stop_cleanup_task()
\ No newline at end of file
@@ -0,0 +1,204 @@
+# src/middleware/admission.py
+
+"""Fair admission of ADK runs when all execution slots are busy."""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncGenerator, Deque, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionQueueFull(RuntimeError):
+    """Raised when a run arrives while the wait queue is already full."""
+
+
+class AdmissionTicket:
+    """A run waiting for, or holding, an execution slot."""
+
+    __slots__ = ("user_id", "priority", "thread_id", "enqueued_at", "admitted", "released", "changed")
+
+    def __init__(self, user_id: str, priority: int, thread_id: Optional[str] = None):
+        self.user_id = user_id
+        self.priority = priority
+        self.thread_id = thread_id
+        self.enqueued_at = time.monotonic()
+        self.admitted = False
+        self.released = False
+        self.changed = asyncio.Event()
+
+
+class AdmissionScheduler:
+    """Hands out a fixed number of execution slots, fairly across users.
+
+    Runs that find every slot busy wait in a bounded queue instead of
+    failing. Waiting runs are grouped by priority (higher first); within a
+    priority level users are served round-robin, so a burst of runs from
+    one user only delays that user's own runs.
+    """
+
+    def __init__(self, max_active: int, max_waiting: int = 100):
+        """
+        Args:
+            max_active: Number of runs allowed to execute at the same time
+            max_waiting: Maximum number of runs waiting for a slot
+        """
+        self._max_active = max_active
+        self._max_waiting = max_waiting
+        self._active = 0
+        self._waiting = 0
+        # priority -> user_id -> waiting tickets, users in round-robin order
+        self._levels: Dict[int, "OrderedDict[str, Deque[AdmissionTicket]]"] = {}
+
+        # Metrics
+        self.admitted_count = 0
+        self.queued_count = 0
+        self.rejected_count = 0
+        self.max_wait_seconds = 0.0
+
+    def enqueue(self, user_id: str, priority: int = 0, thread_id: Optional[str] = None) -> AdmissionTicket:
+        """Request a slot, admitting the run immediately if one is free.
+
+        Raises:
+            AdmissionQueueFull: If the run would have to wait and the queue is full
+        """
+        ticket = AdmissionTicket(user_id, priority, thread_id)
+        if self._active < self._max_active and not self._waiting:
+            self._admit(ticket)
+            return ticket
+
+        if self._waiting >= self._max_waiting:
+            self.rejected_count += 1
+            raise AdmissionQueueFull(
+                f"Maximum concurrent executions ({self._max_active}) reached "
+                f"and {self._waiting} runs already waiting"
+            )
+
+        users = self._levels.setdefault(priority, OrderedDict())
+        users.setdefault(user_id, deque()).append(ticket)
+        self._waiting += 1
+        self.queued_count += 1
+        self._notify_waiters()
+        logger.debug("Queued run for user %s (priority %d), %d waiting", user_id, priority, self._waiting)
+        return ticket
+
+    async def wait(self, ticket: AdmissionTicket) -> AsyncGenerator[int, None]:
+        """Wait until a ticket is admitted or withdrawn, yielding its queue position as it changes."""
+        position = None
+        while not ticket.admitted and not ticket.released:
+            ticket.changed.clear()
+            current = self.position(ticket)
+            if current != position:
+                position = current
+                yield position
+            await ticket.changed.wait()
+
+    def release(self, ticket: AdmissionTicket):
+        """Give back a ticket's slot, or withdraw it from the queue if still waiting."""
+        if ticket.released:
+            return
+        ticket.released = True
+
+        if ticket.admitted:
+            self._active -= 1
+            self._dispatch()
+            return
+
+        users = self._levels.get(ticket.priority, {})
+        tickets = users.get(ticket.user_id)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del users[ticket.user_id]
+            if not users:
+                self._levels.pop(ticket.priority, None)
+            self._waiting -= 1
+            self._notify_waiters()
+        ticket.changed.set()
+
+    def withdraw_thread(self, thread_id: str) -> int:
+        """Withdraw every waiting ticket of a thread, e.g. when its client went away.
+
+        Returns:
+            Number of tickets withdrawn
+        """
+        withdrawn = [
+            ticket
+            for users in self._levels.values()
+            for tickets in users.values()
+            for ticket in tickets
+            if ticket.thread_id == thread_id
+        ]
+        for ticket in withdrawn:
+            self.release(ticket)
+        if withdrawn:
+            logger.debug("Withdrew %d queued runs of thread %s", len(withdrawn), thread_id)
+        return len(withdrawn)
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """1-based number of runs that will be admitted up to and including this one."""
+        if ticket.admitted:
+            return 0
+
+        ahead = 0
+        for priority, users in self._levels.items():
+            if priority > ticket.priority:
+                ahead += sum(len(tickets) for tickets in users.values())
+
+        users = self._levels.get(ticket.priority, OrderedDict())
+        own = users.get(ticket.user_id, ())
+        index = list(own).index(ticket) if ticket in own else 0
+        before_us = True
+        for user_id, tickets in users.items():
+            if user_id == ticket.user_id:
+                before_us = False
+                ahead += index
+                continue
+            # Round-robin: users earlier in the rotation get one extra turn
+            ahead += min(len(tickets), index + (1 if before_us else 0))
+        return ahead + 1
+
+    def _admit(self, ticket: AdmissionTicket):
+        ticket.admitted = True
+        self._active += 1
+        self.admitted_count += 1
+        self.max_wait_seconds = max(self.max_wait_seconds, time.monotonic() - ticket.enqueued_at)
+        ticket.changed.set()
+
+    def _dispatch(self):
+        """Admit waiting runs into free slots: highest priority, then round-robin by user."""
+        while self._active < self._max_active and self._waiting:
+            priority = max(self._levels)
+            users = self._levels[priority]
+            user_id, tickets = next(iter(users.items()))
+            ticket = tickets.popleft()
+            if tickets:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            if not users:
+                del self._levels[priority]
+            self._waiting -= 1
+            self._admit(ticket)
+        self._notify_waiters()
+
+    def _notify_waiters(self):
+        for users in self._levels.values():
+            for tickets in users.values():
+                for ticket in tickets:
+                    ticket.changed.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Slot usage, queue length and admission counters."""
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_active": self._max_active,
+            "max_waiting": self._max_waiting,
+            "admitted": self.admitted_count,
+            "queued": self.queued_count,
+            "rejected": self.rejected_count,
+            "max_wait_seconds": round(self.max_wait_seconds, 3)
+        }
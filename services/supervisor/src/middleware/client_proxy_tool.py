@@ -3,10 +3,11 @@
 """Client-side proxy tool implementation for AG-UI protocol tools."""
 
 import asyncio
+import hashlib
 import json
 import uuid
 import inspect
-from typing import Any, Optional, List, Dict
+from typing import Any, Optional, Dict, Tuple
 import logging
 
 from google.adk.tools import BaseTool, LongRunningFunctionTool
@@ -20,6 +21,69 @@ from ag_ui.core import (
 
 logger = logging.getLogger(__name__)
 
+# Process-wide memo of what only depends on an AG-UI tool definition, keyed by
+# tool_definition_hash(): the validated FunctionDeclaration and the proxy
+# function signature. Cached declarations are shared and must not be mutated.
+_MAX_CACHED_DEFINITIONS = 512
+_definition_cache: Dict[str, Tuple[types.FunctionDeclaration, Optional[inspect.Signature]]] = {}
+
+
+def tool_definition_hash(ag_ui_tool: AGUITool) -> str:
+    """Stable hash of an AG-UI tool's name, description and parameter schema."""
+    definition = json.dumps(
+        [ag_ui_tool.name, ag_ui_tool.description, ag_ui_tool.parameters],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+
+def _build_definition(ag_ui_tool: AGUITool) -> Tuple[types.FunctionDeclaration, Optional[inspect.Signature]]:
+    """Validate a tool's JSON schema into a FunctionDeclaration and a proxy signature."""
+    # Convert AG-UI parameters (JSON Schema) to ADK format
+    parameters = ag_ui_tool.parameters
+
+    # Ensure it's a proper object schema
+    if not isinstance(parameters, dict):
+        parameters = {"type": "object", "properties": {}}
+        logger.warning(f"Tool {ag_ui_tool.name} had non-dict parameters, using empty schema")
+
+    # Create FunctionDeclaration
+    function_declaration = types.FunctionDeclaration(
+        name=ag_ui_tool.name,
+        description=ag_ui_tool.description,
+        parameters=types.Schema.model_validate(parameters)
+    )
+    logger.debug(f"Created FunctionDeclaration for {ag_ui_tool.name}: {function_declaration}")
+
+    # Create dynamic function signature with the schema's parameters for ADK inspection
+    # This allows ADK to extract parameters from user requests correctly
+    sig_params = []
+    if 'properties' in parameters:
+        for param_name in parameters['properties'].keys():
+            # Create parameter with proper type annotation
+            sig_params.append(
+                inspect.Parameter(
+                    param_name,
+                    inspect.Parameter.KEYWORD_ONLY,
+                    default=None,
+                    annotation=Any
+                )
+            )
+    signature = inspect.Signature(sig_params) if sig_params else None
+    return function_declaration, signature
+
+
+def get_tool_definition(ag_ui_tool: AGUITool) -> Tuple[types.FunctionDeclaration, Optional[inspect.Signature]]:
+    """Memoized _build_definition, so schema validation only happens once per definition."""
+    key = tool_definition_hash(ag_ui_tool)
+    definition = _definition_cache.get(key)
+    if definition is None:
+        definition = _build_definition(ag_ui_tool)
+        if len(_definition_cache) >= _MAX_CACHED_DEFINITIONS:
+            _definition_cache.pop(next(iter(_definition_cache)))
+        _definition_cache[key] = definition
+    return definition
 
 
 class ClientProxyTool(BaseTool):
@@ -54,23 +118,9 @@ class ClientProxyTool(BaseTool):
         self.ag_ui_tool = ag_ui_tool
         self.event_queue = event_queue
 
-        # Create dynamic function with proper parameter signatures for ADK inspection
-        # This allows ADK to extract parameters from user requests correctly
-        sig_params = []
-
-        # Extract parameters from AG-UI tool schema
-        parameters = ag_ui_tool.parameters
-        if isinstance(parameters, dict) and 'properties' in parameters:
-            for param_name in parameters['properties'].keys():
-                # Create parameter with proper type annotation
-                sig_params.append(
-                    inspect.Parameter(
-                        param_name,
-                        inspect.Parameter.KEYWORD_ONLY,
-                        default=None,
-                        annotation=Any
-                    )
-                )
+        # Declaration and signature only depend on the tool definition; only
+        # the event queue binding is specific to this instance
+        self._declaration, signature = get_tool_definition(ag_ui_tool)
 
         # Create the async function that will be wrapped by LongRunningFunctionTool
         async def proxy_tool_func(**kwargs) -> Any:
@@ -83,40 +133,23 @@ class ClientProxyTool(BaseTool):
         proxy_tool_func.__name__ = ag_ui_tool.name
         proxy_tool_func.__doc__ = ag_ui_tool.description
 
-        # Create new signature with extracted parameters
-        if sig_params:
-            proxy_tool_func.__signature__ = inspect.Signature(sig_params)
+        # Use the signature with the schema's parameters
+        if signature is not None:
+            proxy_tool_func.__signature__ = signature
 
         # Create the internal LongRunningFunctionTool for proper behavior
         self._long_running_tool = LongRunningFunctionTool(proxy_tool_func)
 
     def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
-        """Create FunctionDeclaration from AG-UI tool parameters.
+        """Return the FunctionDeclaration built from AG-UI tool parameters.
 
-        We override this instead of delegating to the wrapped tool because
+        The declaration is validated once per tool definition and shared
+        (see get_tool_definition). We override this instead of delegating to the wrapped tool because
         the ADK's automatic function calling has difficulty parsing our
         dynamically created function signature without proper type annotations.
         """
         logger.debug(f"_get_declaration called for {self.name}")
-        logger.debug(f"AG-UI tool parameters: {self.ag_ui_tool.parameters}")
-
-        # Convert AG-UI parameters (JSON Schema) to ADK format
-        parameters = self.ag_ui_tool.parameters
-
-
-        # Ensure it's a proper object schema
-        if not isinstance(parameters, dict):
-            parameters = {"type": "object", "properties": {}}
-            logger.warning(f"Tool {self.name} had non-dict parameters, using empty schema")
-
-        # Create FunctionDeclaration
-        function_declaration = types.FunctionDeclaration(
-            name=self.name,
-            description=self.description,
-            parameters=types.Schema.model_validate(parameters)
-        )
-        logger.debug(f"Created FunctionDeclaration for {self.name}: {function_declaration}")
-        return function_declaration
+        return self._declaration
 
     async def run_async(
         self,
@@ -3,6 +3,7 @@
 """Dynamic toolset creation for client-side tools."""
 
 import asyncio
+from contextvars import ContextVar
 from typing import List, Optional
 import logging
 
@@ -15,24 +16,29 @@ from .client_proxy_tool import ClientProxyTool
 
 logger = logging.getLogger(__name__)
 
+# Event queue of the run executing in the current task. Set by the background
+# execution so one toolset (and the agent copy holding it) can serve many runs.
+current_event_queue: ContextVar[Optional[asyncio.Queue]] = ContextVar('current_event_queue', default=None)
+
 
 class ClientProxyToolset(BaseToolset):
     """Dynamic toolset that creates proxy tools from AG-UI tool definitions.
 
-    This toolset is created for each run based on the tools provided in
-    the RunAgentInput, allowing dynamic tool availability per request.
+    This toolset is created for each set of tools provided in the
+    RunAgentInput, allowing dynamic tool availability per request. Without
+    an explicit event queue it emits to the queue of the run it is used in.
     """
 
     def __init__(
         self,
         ag_ui_tools: List[AGUITool],
-        event_queue: asyncio.Queue
+        event_queue: Optional[asyncio.Queue] = None
     ):
         """Initialize the client proxy toolset.
 
         Args:
             ag_ui_tools: List of AG-UI tool definitions
-            event_queue: Queue to emit AG-UI events
+            event_queue: Queue to emit AG-UI events (defaults to current_event_queue)
         """
         super().__init__()
         self.ag_ui_tools = ag_ui_tools
@@ -56,13 +62,18 @@ class ClientProxyToolset(BaseToolset):
             List of ClientProxyTool instances
         """
         # Create fresh proxy tools each time to avoid stale queue references
+        event_queue = self.event_queue or current_event_queue.get()
+        if event_queue is None:
+            logger.error("No event queue available for client proxy tools")
+            return []
+
         proxy_tools = []
 
         for ag_ui_tool in self.ag_ui_tools:
             try:
                 proxy_tool = ClientProxyTool(
                     ag_ui_tool=ag_ui_tool,
-                    event_queue=self.event_queue
+                    event_queue=event_queue
                 )
                 proxy_tools.append(proxy_tool)
                 logger.debug(f"Created proxy tool for '{ag_ui_tool.name}' (long-running)")
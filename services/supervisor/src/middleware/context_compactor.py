@@ -0,0 +1,233 @@
+# src/middleware/context_compactor.py
+
+"""Compaction of the conversation history sent to the model on each call."""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+import json
+import logging
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token for prompt budgeting; close enough for English and JSON
+CHARS_PER_TOKEN = 4
+# Tokens assumed for parts that aren't text or JSON (images, files)
+OTHER_PART_TOKENS = 256
+
+
+def estimate_tokens(contents: List[types.Content]) -> int:
+    """Approximate prompt tokens of a list of contents."""
+    chars = 0
+    other = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text is not None:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(part.function_call.name or "") + len(_dumps(part.function_call.args))
+            elif part.function_response:
+                chars += len(part.function_response.name or "") + len(_dumps(part.function_response.response))
+            else:
+                other += OTHER_PART_TOKENS
+    return chars // CHARS_PER_TOKEN + other
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=str) if value else ""
+
+
+def _is_turn_start(content: types.Content) -> bool:
+    """A user message, as opposed to tool results sent back to the model."""
+    parts = content.parts or []
+    return (
+        content.role == "user"
+        and any(part.text for part in parts)
+        and not any(part.function_response for part in parts)
+    )
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class ContextCompactor:
+    """before_model_callback that keeps the prompt of long sessions small.
+
+    The last ``keep_turns`` turns (a user message and everything the model
+    and tools did in response) go to the model verbatim. Older turns are
+    replaced by a short extractive summary, or dropped, and tool results
+    above ``max_tool_result_chars`` in all but the current turn are cut to
+    a preview. If the prompt still exceeds ``max_prompt_tokens``, the
+    summary and then the oldest kept turns are left out; the current turn
+    is always sent whole. The summary opens the first kept user message,
+    so user and model contents keep alternating.
+
+    Only the request to the model is changed; the session keeps every event.
+
+    Args:
+        keep_turns: Number of most recent turns sent verbatim (including the current one)
+        older_turns: "summarize" to replace older turns with a summary, "drop" to leave them out
+        max_tool_result_chars: Size above which earlier tool results are cut to a preview
+        max_prompt_tokens: Estimated token budget for the conversation (None = no budget)
+        summary_chars: Characters of each message kept in the summary
+        max_tracked_runs: Number of recent runs whose savings are kept for the stats
+    """
+
+    def __init__(
+        self,
+        keep_turns: int = 4,
+        older_turns: str = "summarize",
+        max_tool_result_chars: int = 2000,
+        max_prompt_tokens: Optional[int] = None,
+        summary_chars: int = 160,
+        max_tracked_runs: int = 256
+    ):
+        if older_turns not in ("summarize", "drop"):
+            raise ValueError("older_turns must be 'summarize' or 'drop'")
+        self._keep_turns = max(keep_turns, 1)
+        self._older_turns = older_turns
+        self._max_tool_result_chars = max_tool_result_chars
+        self._max_prompt_tokens = max_prompt_tokens
+        self._summary_chars = summary_chars
+        self._max_tracked_runs = max_tracked_runs
+
+        self._calls = 0
+        self._compacted_calls = 0
+        self._tokens_before = 0
+        self._tokens_after = 0
+        self._runs: "OrderedDict[str, int]" = OrderedDict()  # invocation id -> tokens saved
+
+    def __call__(self, callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        contents = llm_request.contents or []
+        before = estimate_tokens(contents)
+        compacted = self.compact(contents)
+        after = estimate_tokens(compacted) if compacted is not contents else before
+
+        self._calls += 1
+        self._tokens_before += before
+        self._tokens_after += after
+        if compacted is not contents:
+            llm_request.contents = compacted
+            self._compacted_calls += 1
+            logger.debug(f"Compacted prompt from ~{before} to ~{after} tokens ({len(contents)} -> {len(compacted)} contents)")
+
+        invocation_id = getattr(callback_context, "invocation_id", None)
+        if invocation_id:
+            self._runs[invocation_id] = self._runs.get(invocation_id, 0) + before - after
+            self._runs.move_to_end(invocation_id)
+            while len(self._runs) > self._max_tracked_runs:
+                self._runs.popitem(last=False)
+        return None
+
+    def compact(self, contents: List[types.Content]) -> List[types.Content]:
+        """The contents to send instead of `contents` (the same list if nothing changes)."""
+        starts = [i for i, content in enumerate(contents) if _is_turn_start(content)]
+        if not starts:
+            return contents
+        turns = [contents[:starts[0]]] if starts[0] > 0 else []
+        turns += [contents[start:end] for start, end in zip(starts, starts[1:] + [len(contents)])]
+
+        older, kept = turns[:-self._keep_turns], turns[-self._keep_turns:]
+        changed = bool(older)
+        # Earlier tool results are only context now; the current turn's are needed whole
+        for i, turn in enumerate(kept[:-1]):
+            trimmed = [self._trim_tool_results(content) for content in turn]
+            if any(new is not old for new, old in zip(trimmed, turn)):
+                kept[i] = trimmed
+                changed = True
+
+        summary = self._summarize(older) if older and self._older_turns == "summarize" else None
+
+        if self._max_prompt_tokens is not None:
+            def total():
+                return sum(estimate_tokens(turn) for turn in kept) + (len(summary) // CHARS_PER_TOKEN if summary else 0)
+            if summary and total() > self._max_prompt_tokens:
+                summary = None
+                changed = True
+            while len(kept) > 1 and total() > self._max_prompt_tokens:
+                kept.pop(0)
+                changed = True
+
+        if not changed:
+            return contents
+        if summary:
+            first = kept[0][0]
+            kept[0] = [
+                types.Content(role=first.role, parts=[types.Part(text=summary)] + list(first.parts or []))
+            ] + kept[0][1:]
+        result = []
+        for turn in kept:
+            result.extend(turn)
+        return result
+
+    def _trim_tool_results(self, content: types.Content) -> types.Content:
+        parts = content.parts or []
+        if not any(part.function_response for part in parts):
+            return content
+        new_parts = []
+        trimmed = False
+        for part in parts:
+            response = part.function_response
+            if response:
+                payload = _dumps(response.response)
+                if len(payload) > self._max_tool_result_chars:
+                    preview_chars = min(self._max_tool_result_chars, self._summary_chars * 2)
+                    part = types.Part(function_response=types.FunctionResponse(
+                        id=response.id,
+                        name=response.name,
+                        response={
+                            "truncated": True,
+                            "original_chars": len(payload),
+                            "preview": payload[:preview_chars]
+                        }
+                    ))
+                    trimmed = True
+            new_parts.append(part)
+        return types.Content(role=content.role, parts=new_parts) if trimmed else content
+
+    def _summarize(self, turns: List[List[types.Content]]) -> str:
+        """Extractive summary: each user message, the tools used and the last reply."""
+        lines = []
+        for turn in turns:
+            question = None
+            reply = None
+            tools = []
+            for content in turn:
+                text = " ".join(part.text for part in content.parts or [] if part.text and not part.thought)
+                if content.role == "user" and _is_turn_start(content) and question is None:
+                    question = text
+                elif content.role == "model" and text:
+                    reply = text
+                tools.extend(part.function_call.name for part in content.parts or [] if part.function_call)
+            if question:
+                lines.append(f"- User: {_clip(question, self._summary_chars)}")
+            if tools:
+                lines.append(f"  Tools used: {', '.join(dict.fromkeys(tools))}")
+            if reply:
+                lines.append(f"  Assistant: {_clip(reply, self._summary_chars)}")
+        return "Summary of the earlier conversation:\n" + "\n".join(lines) + "\n\n"
+
+    def get_compaction_stats(self) -> Dict[str, Any]:
+        """Estimated prompt tokens before and after compaction.
+
+        Returns:
+            Dictionary with model call counts, token totals and tokens saved per run
+        """
+        saved = self._tokens_before - self._tokens_after
+        runs = list(self._runs.values())
+        return {
+            "model_calls": self._calls,
+            "compacted_calls": self._compacted_calls,
+            "prompt_tokens_before": self._tokens_before,
+            "prompt_tokens_after": self._tokens_after,
+            "prompt_tokens_saved": saved,
+            "tracked_runs": len(runs),
+            "avg_tokens_saved_per_run": sum(runs) / len(runs) if runs else 0.0,
+            "recent_runs_tokens_saved": runs[-10:]
+        }
@@ -0,0 +1,94 @@
+# src/middleware/deadlines.py
+
+"""Shared deadline scheduling for execution timeouts."""
+
+import asyncio
+import heapq
+import itertools
+from typing import Callable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineHandle:
+    """A scheduled deadline; cancel() it once the guarded work has finished."""
+
+    __slots__ = ("when", "callback", "cancelled", "_scheduler")
+
+    def __init__(self, when: float, callback: Callable[[], None], scheduler: "DeadlineScheduler"):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+        self._scheduler = scheduler
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._scheduler._on_cancel()
+
+
+class DeadlineScheduler:
+    """Runs callbacks at their deadlines from a single event loop timer.
+
+    Deadlines are kept in a min-heap and only the earliest one is armed with
+    loop.call_at, so thousands of concurrent runs cost no periodic wakeups.
+    Cancelled deadlines are dropped lazily when they reach the top of the
+    heap, or all at once when they make up most of it.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, DeadlineHandle]] = []
+        self._counter = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._cancelled = 0
+        self.fired_count = 0
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> DeadlineHandle:
+        """Call `callback` (a plain function) `delay` seconds from now unless cancelled."""
+        self._loop = asyncio.get_running_loop()
+        handle = DeadlineHandle(self._loop.time() + delay, callback, self)
+        heapq.heappush(self._heap, (handle.when, next(self._counter), handle))
+        if self._timer is None or handle.when < self._timer.when():
+            self._arm()
+        return handle
+
+    def __len__(self) -> int:
+        """Number of deadlines still pending."""
+        return len(self._heap) - self._cancelled
+
+    def _on_cancel(self):
+        self._cancelled += 1
+        if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+            self._arm()
+
+    def _arm(self):
+        """Point the timer at the earliest live deadline."""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._heap and self._loop is not None and not self._loop.is_closed():
+            self._timer = self._loop.call_at(self._heap[0][0], self._fire)
+
+    def _fire(self):
+        self._timer = None
+        now = self._loop.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, handle = heapq.heappop(self._heap)
+            if handle.cancelled:
+                self._cancelled -= 1
+                continue
+            handle.cancelled = True
+            self.fired_count += 1
+            try:
+                handle.callback()
+            except Exception as e:
+                logger.error(f"Deadline callback failed: {e}", exc_info=True)
+        self._arm()
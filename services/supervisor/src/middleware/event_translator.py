@@ -68,8 +68,8 @@ class EventTranslator:
             # Determine action based on ADK streaming pattern
             should_send_end = turn_complete and not is_partial
             
-            logger.debug(f"📥 ADK Event: partial={is_partial}, turn_complete={turn_complete}, "
-                       f"is_final_response={is_final_response}, should_send_end={should_send_end}")
+            logger.debug("📥 ADK Event: partial=%s, turn_complete=%s, is_final_response=%s, should_send_end=%s",
+                         is_partial, turn_complete, is_final_response, should_send_end)
             
             # Skip user events (already in the conversation)
             if hasattr(adk_event, 'author') and adk_event.author == "user":
@@ -167,16 +167,15 @@ class EventTranslator:
         # Handle None values: if is_final_response=True, it means streaming should end
         should_send_end = is_final_response and not is_partial
         
-        logger.info(f"📥 Text event - partial={is_partial}, turn_complete={turn_complete}, "
-                    f"is_final_response={is_final_response}, should_send_end={should_send_end}, "
-                    f"currently_streaming={self._is_streaming}")
+        logger.debug("📥 Text event - partial=%s, turn_complete=%s, is_final_response=%s, "
+                     "should_send_end=%s, currently_streaming=%s",
+                     is_partial, turn_complete, is_final_response, should_send_end, self._is_streaming)
 
         if is_final_response:
 
             # If a final text response wasn't streamed (not generated by an LLM) then deliver it in 3 events
             if not self._is_streaming and not adk_event.usage_metadata and should_send_end:
-                logger.info(f"⏭️ Deliver non-llm response via message events "
-                            f"event_id={adk_event.id}")
+                logger.debug("⏭️ Deliver non-llm response via message events event_id=%s", adk_event.id)
 
                 combined_text = "".join(text_parts)
                 message_events = [
@@ -198,7 +197,7 @@ class EventTranslator:
                 for msg in message_events:
                     yield msg
 
-            logger.info("⏭️ Skipping final response event (content already streamed)")
+            logger.debug("⏭️ Skipping final response event (content already streamed)")
             
             # If we're currently streaming, this final response means we should end the stream
             if self._is_streaming and self._streaming_message_id:
@@ -206,13 +205,13 @@ class EventTranslator:
                     type=EventType.TEXT_MESSAGE_END,
                     message_id=self._streaming_message_id
                 )
-                logger.info(f"📤 TEXT_MESSAGE_END (from final response): {end_event.model_dump_json()}")
+                logger.debug("📤 TEXT_MESSAGE_END (from final response): %s", end_event.message_id)
                 yield end_event
                 
                 # Reset streaming state
                 self._streaming_message_id = None
                 self._is_streaming = False
-                logger.info("🏁 Streaming completed via final response")
+                logger.debug("🏁 Streaming completed via final response")
             
             return
         
@@ -229,7 +228,7 @@ class EventTranslator:
                 message_id=self._streaming_message_id,
                 role="assistant"
             )
-            logger.info(f"📤 TEXT_MESSAGE_START: {start_event.model_dump_json()}")
+            logger.debug("📤 TEXT_MESSAGE_START: %s", start_event.message_id)
             yield start_event
         
         # Always emit content (unless empty)
@@ -239,7 +238,7 @@ class EventTranslator:
                 message_id=self._streaming_message_id,
                 delta=combined_text
             )
-            logger.info(f"📤 TEXT_MESSAGE_CONTENT: {content_event.model_dump_json()}")
+            logger.debug("📤 TEXT_MESSAGE_CONTENT: %s (%d chars)", content_event.message_id, len(combined_text))
             yield content_event
         
         # If turn is complete and not partial, emit END event
@@ -248,13 +247,13 @@ class EventTranslator:
                 type=EventType.TEXT_MESSAGE_END,
                 message_id=self._streaming_message_id
             )
-            logger.info(f"📤 TEXT_MESSAGE_END: {end_event.model_dump_json()}")
+            logger.debug("📤 TEXT_MESSAGE_END: %s", end_event.message_id)
             yield end_event
             
             # Reset streaming state
             self._streaming_message_id = None
             self._is_streaming = False
-            logger.info("🏁 Streaming completed, state reset")
+            logger.debug("🏁 Streaming completed, state reset")
     
     async def translate_lro_function_calls(self,adk_event: ADKEvent)-> AsyncGenerator[BaseEvent, None]:
         """Translate long running function calls from ADK event to AG-UI tool call events.
@@ -265,39 +264,38 @@ class EventTranslator:
         Yields:
             Tool call events (START, ARGS, END)
         """
-        long_running_function_call = None
         if adk_event.content and adk_event.content.parts:
             for i, part in enumerate(adk_event.content.parts):
-                if part.function_call:
-                    if not long_running_function_call and part.function_call.id in (
-                        adk_event.long_running_tool_ids or []
-                    ):
-                        long_running_function_call = part.function_call
-                        self.long_running_tool_ids.append(long_running_function_call.id)
-                        yield ToolCallStartEvent(
-                            type=EventType.TOOL_CALL_START,
+                # Every long running call of the turn goes to the client, so they can be answered together
+                if part.function_call and part.function_call.id in (
+                    adk_event.long_running_tool_ids or []
+                ):
+                    long_running_function_call = part.function_call
+                    self.long_running_tool_ids.append(long_running_function_call.id)
+                    yield ToolCallStartEvent(
+                        type=EventType.TOOL_CALL_START,
+                        tool_call_id=long_running_function_call.id,
+                        tool_call_name=long_running_function_call.name,
+                        parent_message_id=None
+                    )
+                    if hasattr(long_running_function_call, 'args') and long_running_function_call.args:
+                        # Convert args to string (JSON format)
+                        import json
+                        args_str = json.dumps(long_running_function_call.args) if isinstance(long_running_function_call.args, dict) else str(long_running_function_call.args)
+                        yield ToolCallArgsEvent(
+                            type=EventType.TOOL_CALL_ARGS,
                             tool_call_id=long_running_function_call.id,
-                            tool_call_name=long_running_function_call.name,
-                            parent_message_id=None
+                            delta=args_str
                         )
-                        if hasattr(long_running_function_call, 'args') and long_running_function_call.args:
-                            # Convert args to string (JSON format)
-                            import json
-                            args_str = json.dumps(long_running_function_call.args) if isinstance(long_running_function_call.args, dict) else str(long_running_function_call.args)
-                            yield ToolCallArgsEvent(
-                                type=EventType.TOOL_CALL_ARGS,
-                                tool_call_id=long_running_function_call.id,
-                                delta=args_str
-                            )
-                        
-                        # Emit TOOL_CALL_END
-                        yield ToolCallEndEvent(
-                            type=EventType.TOOL_CALL_END,
-                            tool_call_id=long_running_function_call.id
-                        )                       
-                        
-                        # Clean up tracking
-                        self._active_tool_calls.pop(long_running_function_call.id, None)   
+                    
+                    # Emit TOOL_CALL_END
+                    yield ToolCallEndEvent(
+                        type=EventType.TOOL_CALL_END,
+                        tool_call_id=long_running_function_call.id
+                    )                       
+                    
+                    # Clean up tracking
+                    self._active_tool_calls.pop(long_running_function_call.id, None)   
     
     async def _translate_function_calls(
         self,
@@ -446,7 +444,7 @@ class EventTranslator:
                 type=EventType.TEXT_MESSAGE_END,
                 message_id=self._streaming_message_id
             )
-            logger.info(f"📤 TEXT_MESSAGE_END (forced): {end_event.model_dump_json()}")
+            logger.debug("📤 TEXT_MESSAGE_END (forced): %s", end_event.message_id)
             yield end_event
             
             # Reset streaming state
@@ -4,7 +4,7 @@
 
 import asyncio
 import time
-from typing import Optional, Set
+from typing import Set
 import logging
 
 logger = logging.getLogger(__name__)
@@ -37,10 +37,23 @@ class ExecutionState:
         self.event_queue = event_queue
         self.start_time = time.time()
         self.is_complete = False
+        self.timed_out = False
+        self.deadline = None  # DeadlineHandle enforcing the execution timeout
         self.pending_tool_calls: Set[str] = set()  # Track outstanding tool call IDs for HITL
 
+        task.add_done_callback(self._on_task_done)
         logger.debug(f"Created execution state for thread {thread_id}")
 
+    def _on_task_done(self, task: asyncio.Task):
+        """Wake the consumer as soon as the task ends, sentinel or not."""
+        if self.deadline is not None:
+            self.deadline.cancel()
+        try:
+            self.event_queue.put_nowait(None)
+        except asyncio.QueueFull:
+            # The consumer is draining a full queue and will find the task done
+            pass
+
     def is_stale(self, timeout_seconds: int) -> bool:
         """Check if this execution has been running too long.
 
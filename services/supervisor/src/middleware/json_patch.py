@@ -0,0 +1,126 @@
+# src/middleware/json_patch.py
+
+"""Minimal RFC 6902 JSON Patch generation and application for AG-UI state deltas."""
+
+import copy
+from typing import Any, Dict, List
+
+JsonPatch = List[Dict[str, Any]]
+
+
+class JsonPatchError(ValueError):
+    """Raised when a patch cannot be applied to a document."""
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def _same(a: Any, b: Any) -> bool:
+    # bool is an int subclass and 1 == 1.0, but JSON tells them apart
+    return type(a) is type(b) and a == b
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> JsonPatch:
+    """Operations turning `old` into `new`.
+
+    Objects are compared key by key and arrays element by element (with
+    trailing elements added or removed), so a change deep inside a large
+    state only produces operations for the values that changed.
+
+    Args:
+        old: Document the client holds
+        new: Document the client should end up with
+        path: JSON Pointer of the documents (empty for the root)
+
+    Returns:
+        List of "add", "remove" and "replace" operations (empty if equal)
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch: JsonPatch = []
+        for key in old:
+            if key not in new:
+                patch.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                patch.append({"op": "add", "path": child, "value": copy.deepcopy(value)})
+            else:
+                patch.extend(make_patch(old[key], value, child))
+        return patch
+
+    if isinstance(old, list) and isinstance(new, list):
+        patch = []
+        for index in range(min(len(old), len(new))):
+            patch.extend(make_patch(old[index], new[index], f"{path}/{index}"))
+        for index in range(len(old) - 1, len(new) - 1, -1):
+            # Remove from the end so earlier indices stay valid
+            patch.append({"op": "remove", "path": f"{path}/{index}"})
+        for index in range(len(old), len(new)):
+            patch.append({"op": "add", "path": f"{path}/{index}", "value": copy.deepcopy(new[index])})
+        return patch
+
+    if _same(old, new):
+        return []
+    return [{"op": "replace", "path": path, "value": copy.deepcopy(new)}]
+
+
+def apply_patch(document: Any, patch: JsonPatch) -> Any:
+    """Apply "add", "remove" and "replace" operations to a copy of `document`.
+
+    Raises:
+        JsonPatchError: If an operation is unsupported or its path does not exist
+    """
+    document = copy.deepcopy(document)
+    for operation in patch:
+        op = operation.get("op")
+        path = operation.get("path", "")
+        if op not in ("add", "remove", "replace"):
+            raise JsonPatchError(f"Unsupported patch operation: {op}")
+
+        if path == "":
+            if op == "remove":
+                raise JsonPatchError("Cannot remove the document root")
+            document = copy.deepcopy(operation["value"])
+            continue
+
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        try:
+            for token in tokens[:-1]:
+                parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        except (KeyError, IndexError, ValueError, TypeError) as e:
+            raise JsonPatchError(f"Path not found: {path}") from e
+
+        last = tokens[-1]
+        if isinstance(parent, dict):
+            if op != "add" and last not in parent:
+                raise JsonPatchError(f"Path not found: {path}")
+            if op == "remove":
+                del parent[last]
+            else:
+                parent[last] = copy.deepcopy(operation["value"])
+        elif isinstance(parent, list):
+            if last == "-" and op == "add":
+                parent.append(copy.deepcopy(operation["value"]))
+                continue
+            try:
+                index = int(last)
+            except ValueError as e:
+                raise JsonPatchError(f"Invalid array index in {path}") from e
+            limit = len(parent) if op == "add" else len(parent) - 1
+            if not 0 <= index <= limit:
+                raise JsonPatchError(f"Array index out of range: {path}")
+            if op == "add":
+                parent.insert(index, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                del parent[index]
+            else:
+                parent[index] = copy.deepcopy(operation["value"])
+        else:
+            raise JsonPatchError(f"Path not found: {path}")
+    return document
@@ -0,0 +1,154 @@
+# src/middleware/pending_tool_calls.py
+
+"""In-memory index of pending (HITL) tool calls with write-behind persistence."""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+PENDING_CALLS_KEY = "pending_tool_calls"
+PENDING_NAMES_KEY = "pending_tool_names"
+
+
+class PendingToolCallIndex:
+    """Authoritative record of outstanding client tool calls per thread.
+
+    Lookups and updates only touch memory. Changes are written to session
+    state by flush(), once per run, as a single state delta holding the
+    pending call ids (under the same "pending_tool_calls" key as before, so
+    session cleanup still spares threads waiting on a tool result) and their
+    tool names. A thread's entry is recovered from session state by load()
+    the first time it is used after a restart. Threads known to have nothing
+    pending are remembered (up to max_idle_threads) so their runs don't read
+    session state at all.
+    """
+
+    def __init__(self, session_manager, max_idle_threads: int = 4096):
+        """
+        Args:
+            session_manager: SessionManager used to read and persist session state
+            max_idle_threads: Number of threads with nothing pending remembered as such
+        """
+        self._session_manager = session_manager
+        self._max_idle = max_idle_threads
+        self._calls: Dict[str, Dict[str, Optional[str]]] = {}  # thread_id -> tool_call_id -> tool name
+        self._idle: "OrderedDict[str, None]" = OrderedDict()  # threads with nothing pending, LRU order
+        self._context: Dict[str, Tuple[str, str]] = {}  # thread_id -> (app_name, user_id)
+        self._dirty: Set[str] = set()
+
+        # Metrics
+        self.loads = 0
+        self.flushes = 0
+
+    async def load(self, thread_id: str, app_name: str, user_id: str):
+        """Recover a thread's pending calls from session state, unless already in memory."""
+        if thread_id in self._calls:
+            return
+        self._context[thread_id] = (app_name, user_id)
+        if thread_id in self._idle:
+            self._idle.move_to_end(thread_id)
+            return
+        state = await self._session_manager.get_session_state(thread_id, app_name, user_id) or {}
+        self.loads += 1
+        if thread_id in self._calls or thread_id in self._idle:
+            # Another run of this thread loaded it while we were waiting
+            return
+
+        names = state.get(PENDING_NAMES_KEY) or {}
+        calls = {
+            tool_call_id: names.get(tool_call_id)
+            for tool_call_id in state.get(PENDING_CALLS_KEY) or []
+        }
+        if calls:
+            self._calls[thread_id] = calls
+            logger.info(f"Recovered {len(calls)} pending tool calls for thread {thread_id}")
+        else:
+            self._mark_idle(thread_id)
+
+    def add(self, thread_id: str, tool_call_id: str, tool_name: Optional[str] = None):
+        self._idle.pop(thread_id, None)
+        calls = self._calls.setdefault(thread_id, {})
+        if tool_call_id not in calls or (tool_name and not calls[tool_call_id]):
+            calls[tool_call_id] = tool_name
+            self._dirty.add(thread_id)
+            logger.debug(f"Added pending tool call {tool_call_id} to thread {thread_id}")
+
+    def remove(self, thread_id: str, tool_call_id: str) -> bool:
+        """Returns: True if the call was pending."""
+        calls = self._calls.get(thread_id)
+        if not calls or tool_call_id not in calls:
+            return False
+        del calls[tool_call_id]
+        self._dirty.add(thread_id)
+        logger.debug(f"Removed pending tool call {tool_call_id} from thread {thread_id}")
+        return True
+
+    def has_pending(self, thread_id: str) -> bool:
+        return bool(self._calls.get(thread_id))
+
+    def is_pending(self, thread_id: str, tool_call_id: str) -> bool:
+        return tool_call_id in self._calls.get(thread_id, ())
+
+    def get_pending(self, thread_id: str) -> List[str]:
+        return list(self._calls.get(thread_id, ()))
+
+    def tool_name(self, thread_id: str, tool_call_id: str) -> Optional[str]:
+        return self._calls.get(thread_id, {}).get(tool_call_id)
+
+    async def flush(self, thread_id: str, app_name: Optional[str] = None, user_id: Optional[str] = None) -> bool:
+        """Persist a thread's pending calls if they changed since the last flush.
+
+        Returns:
+            True if session state was written
+        """
+        if app_name and user_id:
+            self._context[thread_id] = (app_name, user_id)
+
+        calls = self._calls.get(thread_id, {})
+        if thread_id in self._dirty:
+            context = self._context.get(thread_id)
+            if context is None:
+                logger.warning(f"Cannot persist pending tool calls for thread {thread_id}: unknown session")
+                return False
+
+            success = await self._session_manager.update_session_state(
+                thread_id, context[0], context[1],
+                {
+                    PENDING_CALLS_KEY: list(calls),
+                    PENDING_NAMES_KEY: {tool_call_id: name for tool_call_id, name in calls.items() if name}
+                }
+            )
+            if not success:
+                return False
+            self._dirty.discard(thread_id)
+            self.flushes += 1
+            logger.info(f"Persisted {len(calls)} pending tool calls for thread {thread_id}")
+
+        # Threads with nothing pending only keep their place in the idle list
+        if not calls and thread_id not in self._dirty:
+            self._calls.pop(thread_id, None)
+            self._context.pop(thread_id, None)
+            self._mark_idle(thread_id)
+        return True
+
+    def _mark_idle(self, thread_id: str):
+        """Remember that a thread has nothing pending, forgetting the least recently used beyond max_idle_threads."""
+        self._idle[thread_id] = None
+        self._idle.move_to_end(thread_id)
+        while len(self._idle) > self._max_idle:
+            self._idle.popitem(last=False)
+
+    def forget(self, thread_id: str):
+        """Drop a thread from memory without persisting it."""
+        self._calls.pop(thread_id, None)
+        self._idle.pop(thread_id, None)
+        self._context.pop(thread_id, None)
+        self._dirty.discard(thread_id)
+
+    def clear(self):
+        self._calls.clear()
+        self._idle.clear()
+        self._context.clear()
+        self._dirty.clear()
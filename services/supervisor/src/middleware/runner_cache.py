@@ -0,0 +1,99 @@
+# src/middleware/runner_cache.py
+
+"""Bounded LRU cache of prepared agents and their runners."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+import logging
+
+from google.adk import Runner
+from ag_ui.core import Tool as AGUITool
+
+logger = logging.getLogger(__name__)
+
+
+def runner_fingerprint(
+    app_name: str,
+    agent: Any,
+    system_content: Optional[str],
+    tools: Optional[Iterable[AGUITool]]
+) -> str:
+    """Stable key for an agent prepared with a SystemMessage and client tools.
+
+    Args:
+        app_name: Application name the runner is created for
+        agent: The base ADK agent (identified by object identity)
+        system_content: SystemMessage appended to the agent instructions, if any
+        tools: Client-side AG-UI tool definitions added to the agent, None for no toolset
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{app_name}\0{id(agent)}\0{system_content or ''}\0{tools is not None}\0".encode("utf-8"))
+    for tool in tools or ():
+        digest.update(json.dumps(
+            [tool.name, tool.description, tool.parameters],
+            sort_keys=True,
+            default=str
+        ).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RunnerCache:
+    """LRU of Runners (each holding its prepared agent copy) keyed by fingerprint.
+
+    Runners and prepared agents carry no per-run state; the event queue of a
+    run reaches its client proxy tools through a context variable, so a
+    cached entry can serve any number of concurrent runs.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        """
+        Args:
+            max_entries: Maximum number of cached runners (0 disables caching)
+        """
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[str, Runner]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Runner]:
+        runner = self._entries.get(key)
+        if runner is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return runner
+
+    def put(self, key: str, runner: Runner):
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = runner
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Optional[str] = None):
+        """Drop one entry, or every entry when no key is given."""
+        if key is None:
+            self._entries.clear()
+            logger.info("Invalidated all cached runners")
+        else:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        return {
+            "size": len(self._entries),
+            "max_entries": self._max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
@@ -2,14 +2,152 @@
 
 """Session manager that adds production features to ADK's native session service."""
 
-from typing import Dict, Optional, Set, Any, Union
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Any, Union, Iterator, Tuple
 import asyncio
+import heapq
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
 
+def _same_value(a: Any, b: Any) -> bool:
+    """Structural equality that, unlike ==, tells True from 1 and 1 from 1.0."""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same_value(v, b[k]) for k, v in a.items())
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same_value(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+def diff_state(current: Dict[str, Any], incoming: Dict[str, Any]) -> Dict[str, Any]:
+    """Keys of `incoming` that are missing from, or differ from, `current`.
+
+    Args:
+        current: Session state as stored
+        incoming: State received from the client
+
+    Returns:
+        State delta holding only the changed keys (empty if nothing changed)
+    """
+    return {
+        key: value for key, value in incoming.items()
+        if key not in current or not _same_value(current[key], value)
+    }
+
+
+class SessionIndex:
+    """Index of tracked sessions, in both directions and by last use.
+
+    Maps session keys ("app_name:session_id") to their app, session id,
+    user and last-touch time, session ids back to their key, and users to
+    their session keys. Entries are kept in least-recently-touched order,
+    so every lookup, and finding the oldest sessions, is O(1) per session.
+
+    Touch times are also pushed on a min-heap, so the sessions idle for
+    longer than a cutoff can be found without looking at any other one.
+    Heap entries superseded by a later touch are skipped when popped.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, list]" = OrderedDict()  # key -> [app_name, session_id, user_id, touched_at]
+        self._by_id: Dict[str, str] = {}  # session_id -> session_key
+        self._by_user: Dict[str, Set[str]] = {}  # user_id -> session_keys
+        self._expiry: List[Tuple[float, str]] = []  # (touched_at, session_key) min-heap
+
+    def add(self, session_key: str, app_name: str, session_id: str, user_id: str):
+        """Track a session (or refresh it if already tracked) and mark it as used now."""
+        entry = self._entries.get(session_key)
+        if entry is None:
+            now = time.time()
+            self._entries[session_key] = [app_name, session_id, user_id, now]
+            self._by_id[session_id] = session_key
+            self._by_user.setdefault(user_id, set()).add(session_key)
+            self._push_expiry(now, session_key)
+        else:
+            self.touch(session_key)
+
+    def touch(self, session_key: str, at: Optional[float] = None):
+        """Mark a tracked session as used now (or at a given time)."""
+        entry = self._entries.get(session_key)
+        if entry is not None:
+            entry[3] = time.time() if at is None else at
+            self._entries.move_to_end(session_key)
+            self._push_expiry(entry[3], session_key)
+
+    def pop_idle(self, cutoff: float) -> List[str]:
+        """Take the sessions last touched before `cutoff` off the expiry heap.
+
+        A returned session is only scheduled again once it is touched.
+        """
+        due = []
+        while self._expiry and self._expiry[0][0] <= cutoff:
+            touched_at, session_key = heapq.heappop(self._expiry)
+            entry = self._entries.get(session_key)
+            if entry is not None and entry[3] == touched_at:
+                due.append(session_key)
+        return due
+
+    def _push_expiry(self, touched_at: float, session_key: str):
+        heapq.heappush(self._expiry, (touched_at, session_key))
+        # Drop superseded entries once they dominate the heap
+        if len(self._expiry) > 2 * len(self._entries) + 64:
+            self._expiry = [(entry[3], key) for key, entry in self._entries.items()]
+            heapq.heapify(self._expiry)
+
+    def remove(self, session_key: str):
+        entry = self._entries.pop(session_key, None)
+        if entry is None:
+            return
+        _, session_id, user_id, _ = entry
+        if self._by_id.get(session_id) == session_key:
+            del self._by_id[session_id]
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(session_key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def lookup(self, session_id: str) -> Optional[Tuple[str, str]]:
+        """Returns: (app_name, user_id) of a session id, or None if not tracked."""
+        session_key = self._by_id.get(session_id)
+        if session_key is None:
+            return None
+        entry = self._entries[session_key]
+        return entry[0], entry[2]
+
+    def owner(self, session_key: str) -> Optional[str]:
+        entry = self._entries.get(session_key)
+        return entry[2] if entry else None
+
+    def user_sessions(self, user_id: str) -> Set[str]:
+        return self._by_user.get(user_id, set())
+
+    def oldest_user_session(self, user_id: str) -> Optional[str]:
+        """Least recently touched session key of a user."""
+        keys = self._by_user.get(user_id)
+        if not keys:
+            return None
+        return min(keys, key=lambda session_key: self._entries[session_key][3])
+
+    def oldest(self) -> Iterator[str]:
+        """Session keys from least to most recently touched.
+
+        Lazy, so taking the first few is O(1); the index must not change
+        while the iterator is in use.
+        """
+        return iter(self._entries)
+
+    def __contains__(self, session_key: str) -> bool:
+        return session_key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class SessionManager:
     """Session manager that wraps ADK's session service.
     
@@ -38,6 +176,8 @@ class SessionManager:
         session_timeout_seconds: int = 1200,  # 20 minutes default
         cleanup_interval_seconds: int = 300,  # 5 minutes
         max_sessions_per_user: Optional[int] = None,
+        max_tracked_sessions: Optional[int] = 100000,
+        pending_tool_call_timeout_seconds: Optional[int] = None,
         auto_cleanup: bool = True
     ):
         """Initialize the session manager.
@@ -48,6 +188,10 @@ class SessionManager:
             session_timeout_seconds: Time before a session is considered expired
             cleanup_interval_seconds: Interval between cleanup cycles
             max_sessions_per_user: Maximum concurrent sessions per user (None = unlimited)
+            max_tracked_sessions: Maximum sessions overall; beyond it the least recently
+                used session without pending tool calls is removed (None = unlimited)
+            pending_tool_call_timeout_seconds: How much longer than the session timeout a
+                session with pending tool calls is kept (None = until they are answered)
             auto_cleanup: Enable automatic session cleanup task
         """
         if self._initialized:
@@ -62,11 +206,19 @@ class SessionManager:
         self._timeout = session_timeout_seconds
         self._cleanup_interval = cleanup_interval_seconds
         self._max_per_user = max_sessions_per_user
+        self._max_tracked = max_tracked_sessions
+        self._pending_grace = pending_tool_call_timeout_seconds
         self._auto_cleanup = auto_cleanup
         
-        # Minimal tracking: just keys and user counts
-        self._session_keys: Set[str] = set()  # "app_name:session_id" keys
-        self._user_sessions: Dict[str, Set[str]] = {}  # user_id -> set of session_keys
+        # Tracked sessions by key, session id, user and last use
+        self._index = SessionIndex()
+        # In-memory record of pending tool calls, see use_pending_index()
+        self._pending_index = None
+        
+        # State sync metrics
+        self.state_writes = 0
+        self.state_writes_skipped = 0
+        self.state_keys_written = 0
         
         self._cleanup_task: Optional[asyncio.Task] = None
         self._initialized = True
@@ -79,6 +231,15 @@ class SessionManager:
             f"memory: {'enabled' if memory_service else 'disabled'}"
         )
     
+    def use_pending_index(self, pending_index):
+        """Tell which sessions wait on a tool result from memory instead of their state.
+
+        Args:
+            pending_index: PendingToolCallIndex whose has_pending(session_id) is
+                authoritative for the threads it holds
+        """
+        self._pending_index = pending_index
+
     @classmethod
     def get_instance(cls, **kwargs):
         """Get the singleton instance."""
@@ -111,12 +272,16 @@ class SessionManager:
         session_key = f"{app_name}:{session_id}"
         
         # Check user limits before creating
-        if session_key not in self._session_keys and self._max_per_user:
-            user_count = len(self._user_sessions.get(user_id, set()))
+        if session_key not in self._index and self._max_per_user:
+            user_count = len(self._index.user_sessions(user_id))
             if user_count >= self._max_per_user:
                 # Remove oldest session for this user
                 await self._remove_oldest_user_session(user_id)
         
+        # Keep the overall number of tracked sessions bounded
+        if session_key not in self._index and self._max_tracked and len(self._index) >= self._max_tracked:
+            await self._remove_least_recently_used_session()
+        
         # Get or create via ADK
         session = await self._session_service.get_session(
             session_id=session_id,
@@ -136,7 +301,7 @@ class SessionManager:
             logger.debug(f"Retrieved existing session: {session_key}")
         
         # Track the session key
-        self._track_session(session_key, user_id)
+        self._track_session(session_key, user_id, app_name, session_id)
         
         # Start cleanup if needed
         if self._auto_cleanup and not self._cleanup_task:
@@ -181,9 +346,6 @@ class SessionManager:
                 logger.debug(f"No state updates provided for session: {app_name}:{session_id}")
                 return False
             
-            # Apply state updates using EventActions
-            from google.adk.events import Event, EventActions
-            
             # Prepare state delta
             if merge:
                 # Merge with existing state
@@ -194,27 +356,83 @@ class SessionManager:
                 # Note: Complete replacement might need clearing existing keys
                 # This depends on ADK's behavior - may need to explicitly clear
             
-            # Create event with state changes
-            actions = EventActions(state_delta=state_delta)
-            event = Event(
-                invocation_id=f"state_update_{int(time.time())}",
-                author="system",
-                actions=actions,
-                timestamp=time.time()
+            await self._append_state_delta(session, app_name, session_id, state_delta)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to update session state: {e}", exc_info=True)
+            return False
+    
+    async def sync_session_state(
+        self,
+        session_id: str,
+        app_name: str,
+        user_id: str,
+        state: Dict[str, Any]
+    ) -> bool:
+        """Bring session state in line with a client's state, writing only what changed.
+        
+        Keys whose values differ structurally from the session's are written
+        as a single state delta; keys the client did not send are left as
+        they are. When nothing differs no event is appended at all.
+        
+        Args:
+            session_id: Session identifier
+            app_name: Application name
+            user_id: User identifier
+            state: Full state as held by the client
+            
+        Returns:
+            True if a state delta was written
+        """
+        if not state:
+            return False
+        
+        try:
+            session = await self._session_service.get_session(
+                session_id=session_id,
+                app_name=app_name,
+                user_id=user_id
             )
             
-            # Apply changes through ADK's event system
-            await self._session_service.append_event(session, event)
+            if not session:
+                logger.debug(f"Session not found for state sync: {app_name}:{session_id}")
+                return False
             
-            logger.info(f"Updated state for session {app_name}:{session_id}")
-            logger.debug(f"State updates: {state_updates}")
+            state_delta = diff_state(session.state or {}, state)
+            if not state_delta:
+                self.state_writes_skipped += 1
+                logger.debug(f"Client state unchanged for session {app_name}:{session_id}, skipping write")
+                return False
             
+            await self._append_state_delta(session, app_name, session_id, state_delta)
+            self.state_writes += 1
+            self.state_keys_written += len(state_delta)
             return True
             
         except Exception as e:
-            logger.error(f"Failed to update session state: {e}", exc_info=True)
+            logger.error(f"Failed to sync session state: {e}", exc_info=True)
             return False
     
+    async def _append_state_delta(self, session, app_name: str, session_id: str, state_delta: Dict[str, Any]):
+        """Apply a state delta through ADK's event system."""
+        from google.adk.events import Event, EventActions
+        
+        # Create event with state changes
+        actions = EventActions(state_delta=state_delta)
+        event = Event(
+            invocation_id=f"state_update_{int(time.time())}",
+            author="system",
+            actions=actions,
+            timestamp=time.time()
+        )
+        
+        await self._session_service.append_event(session, event)
+        self._index.touch(f"{app_name}:{session_id}")
+        
+        logger.info(f"Updated state for session {app_name}:{session_id}")
+        logger.debug(f"State updates: {state_delta}")
+    
     async def get_session_state(
         self,
         session_id: str,
@@ -477,11 +695,12 @@ class SessionManager:
         """
         results = {}
         
-        if user_id not in self._user_sessions:
+        session_keys = self._index.user_sessions(user_id)
+        if not session_keys:
             logger.info(f"No sessions found for user {user_id}")
             return results
         
-        for session_key in self._user_sessions[user_id]:
+        for session_key in list(session_keys):
             app_name, session_id = session_key.split(':', 1)
             
             # Apply filter if specified
@@ -501,33 +720,65 @@ class SessionManager:
     
     # ===== EXISTING METHODS (unchanged) =====
     
-    def _track_session(self, session_key: str, user_id: str):
-        """Track a session key for enumeration."""
-        self._session_keys.add(session_key)
-        
-        if user_id not in self._user_sessions:
-            self._user_sessions[user_id] = set()
-        self._user_sessions[user_id].add(session_key)
+    def _track_session(self, session_key: str, user_id: str, app_name: str, session_id: str):
+        """Track a session key for enumeration and lookups."""
+        self._index.add(session_key, app_name, session_id, user_id)
     
     def _untrack_session(self, session_key: str, user_id: str):
         """Remove session tracking."""
-        self._session_keys.discard(session_key)
+        self._index.remove(session_key)
+    
+    def lookup_session(self, session_id: str) -> Optional[Dict[str, str]]:
+        """Find the app and user of a tracked session id without scanning.
         
-        if user_id in self._user_sessions:
-            self._user_sessions[user_id].discard(session_key)
-            if not self._user_sessions[user_id]:
-                del self._user_sessions[user_id]
+        Returns:
+            Dictionary with app_name and user_id, or None if not tracked
+        """
+        found = self._index.lookup(session_id)
+        if found is None:
+            return None
+        return {"app_name": found[0], "user_id": found[1]}
     
     async def _remove_oldest_user_session(self, user_id: str):
-        """Remove the oldest session for a user based on lastUpdateTime."""
-        if user_id not in self._user_sessions:
+        """Remove the least recently used session of a user."""
+        session_key = self._index.oldest_user_session(user_id)
+        if session_key is None:
             return
         
-        oldest_session = None
-        oldest_time = float('inf')
+        app_name, session_id = session_key.split(':', 1)
+        try:
+            session = await self._session_service.get_session(
+                session_id=session_id,
+                app_name=app_name,
+                user_id=user_id
+            )
+        except Exception as e:
+            logger.error(f"Error checking session {session_key}: {e}")
+            return
         
-        # Find oldest session by checking ADK's lastUpdateTime
-        for session_key in self._user_sessions[user_id]:
+        if session:
+            await self._delete_session(session)
+            logger.info(f"Removed oldest session for user {user_id}: {session_key}")
+        else:
+            self._untrack_session(session_key, user_id)
+    
+    async def _remove_least_recently_used_session(self):
+        """Remove the least recently used session that isn't waiting on a tool result.
+
+        Sessions the pending index holds calls for are passed over in memory;
+        only the chosen session is read, and skipped too if its state shows
+        pending calls the index didn't know about.
+        """
+        skipped: Set[str] = set()
+        while True:
+            session_key = next(
+                (key for key in self._index.oldest() if key not in skipped and not self._is_waiting(key)),
+                None
+            )
+            if session_key is None:
+                return
+
+            user_id = self._index.owner(session_key)
             app_name, session_id = session_key.split(':', 1)
             try:
                 session = await self._session_service.get_session(
@@ -535,19 +786,27 @@ class SessionManager:
                     app_name=app_name,
                     user_id=user_id
                 )
-                if session and hasattr(session, 'last_update_time'):
-                    update_time = session.last_update_time
-                    if update_time < oldest_time:
-                        oldest_time = update_time
-                        oldest_session = session
             except Exception as e:
                 logger.error(f"Error checking session {session_key}: {e}")
-        
-        if oldest_session:
-            session_key = f"{oldest_session.app_name}:{oldest_session.id}"
-            await self._delete_session(oldest_session)
-            logger.info(f"Removed oldest session for user {user_id}: {session_key}")
+                skipped.add(session_key)
+                continue
+            
+            if not session:
+                self._untrack_session(session_key, user_id)
+                return
+            if session.state and session.state.get("pending_tool_calls"):
+                skipped.add(session_key)
+                continue
+            await self._delete_session(session)
+            logger.info(f"Removed least recently used session {session_key} (tracking limit {self._max_tracked})")
+            return
     
+    def _is_waiting(self, session_key: str) -> bool:
+        """Whether the pending index holds tool calls for a tracked session."""
+        if self._pending_index is None:
+            return False
+        return self._pending_index.has_pending(session_key.split(':', 1)[1])
+
     async def _delete_session(self, session):
         """Delete a session using the session object directly.
         
@@ -605,23 +864,20 @@ class SessionManager:
                 logger.error(f"Cleanup error: {e}", exc_info=True)
     
     async def _cleanup_expired_sessions(self):
-        """Find and remove expired sessions based on lastUpdateTime."""
+        """Remove sessions idle for longer than the timeout.
+
+        Only sessions the index reports as idle past the timeout are looked
+        up. A session updated through the ADK runner in the meantime is
+        rescheduled from its lastUpdateTime, and sessions waiting on a
+        client tool result are rescheduled instead of being deleted, for
+        up to pending_tool_call_timeout_seconds past the timeout.
+        """
         current_time = time.time()
         expired_count = 0
         
-        # Check all tracked sessions
-        for session_key in list(self._session_keys):  # Copy to avoid modification during iteration
+        for session_key in self._index.pop_idle(current_time - self._timeout):
             app_name, session_id = session_key.split(':', 1)
-            
-            # Find user_id for this session
-            user_id = None
-            for uid, keys in self._user_sessions.items():
-                if session_key in keys:
-                    user_id = uid
-                    break
-            
-            if not user_id:
-                continue
+            user_id = self._index.owner(session_key)
             
             try:
                 session = await self._session_service.get_session(
@@ -630,33 +886,51 @@ class SessionManager:
                     user_id=user_id
                 )
                 
-                if session and hasattr(session, 'last_update_time'):
-                    age = current_time - session.last_update_time
-                    if age > self._timeout:
-                        # Check for pending tool calls before deletion (HITL scenarios)
-                        pending_calls = session.state.get("pending_tool_calls", []) if session.state else []
-                        if pending_calls:
-                            logger.info(f"Preserving expired session {session_key} - has {len(pending_calls)} pending tool calls (HITL)")
-                        else:
-                            await self._delete_session(session)
-                            expired_count += 1
-                elif not session:
+                if not session:
                     # Session doesn't exist, just untrack it
                     self._untrack_session(session_key, user_id)
+                    continue
+                
+                last_update_time = getattr(session, 'last_update_time', None) or 0
+                if current_time - last_update_time <= self._timeout:
+                    self._index.touch(session_key, at=last_update_time)
+                    continue
+                
+                # Check for pending tool calls before deletion (HITL scenarios)
+                pending_calls = session.state.get("pending_tool_calls", []) if session.state else []
+                abandoned = (
+                    self._pending_grace is not None
+                    and current_time - last_update_time > self._timeout + self._pending_grace
+                )
+                if pending_calls and not abandoned:
+                    logger.info(f"Preserving expired session {session_key} - has {len(pending_calls)} pending tool calls (HITL)")
+                    self._index.touch(session_key, at=current_time)
+                else:
+                    await self._delete_session(session)
+                    expired_count += 1
                     
             except Exception as e:
                 logger.error(f"Error checking session {session_key}: {e}")
+                self._index.touch(session_key, at=current_time)
         
         if expired_count > 0:
             logger.info(f"Cleaned up {expired_count} expired sessions")
     
     def get_session_count(self) -> int:
         """Get total number of tracked sessions."""
-        return len(self._session_keys)
+        return len(self._index)
+    
+    def get_state_sync_stats(self) -> Dict[str, int]:
+        """Counts of client state writes made and skipped by sync_session_state()."""
+        return {
+            "writes": self.state_writes,
+            "skipped": self.state_writes_skipped,
+            "keys_written": self.state_keys_written
+        }
     
     def get_user_session_count(self, user_id: str) -> int:
         """Get number of sessions for a user."""
-        return len(self._user_sessions.get(user_id, set()))
+        return len(self._index.user_sessions(user_id))
     
     async def stop_cleanup_task(self):
         """Stop the cleanup task."""
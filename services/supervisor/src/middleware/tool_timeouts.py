@@ -0,0 +1,62 @@
+# src/middleware/tool_timeouts.py
+
+"""Per-call timeouts for backend tools and the result reported when one expires."""
+
+import asyncio
+from typing import Any, Dict, List
+import logging
+
+from google.adk.tools import BaseTool, FunctionTool
+from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+
+def tool_timeout_result(tool_name: str, timeout_seconds: float) -> Dict[str, Any]:
+    """Function response standing in for a tool call that ran out of time."""
+    return {
+        "error": f"Tool '{tool_name}' did not complete within {timeout_seconds:g} seconds",
+        "timed_out": True
+    }
+
+
+class TimedFunctionTool(FunctionTool):
+    """FunctionTool that stops waiting for its function after a timeout.
+
+    The model gets tool_timeout_result() instead of the function's result.
+    Async functions are cancelled; a sync function running on ADK's tool
+    thread pool can't be interrupted and finishes in the background. (Sync
+    functions running on the event loop block it, so they can't time out.)
+    """
+
+    def __init__(self, func, timeout_seconds: float, *, require_confirmation=False):
+        super().__init__(func, require_confirmation=require_confirmation)
+        self.timeout_seconds = timeout_seconds
+
+    async def run_async(self, *, args: Dict[str, Any], tool_context: ToolContext) -> Any:
+        try:
+            return await asyncio.wait_for(
+                super().run_async(args=args, tool_context=tool_context),
+                self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Backend tool {self.name} timed out after {self.timeout_seconds}s")
+            return tool_timeout_result(self.name, self.timeout_seconds)
+
+
+def with_tool_timeouts(tools: List[Any], timeout_seconds: float) -> List[Any]:
+    """Agent tools with plain functions and FunctionTools replaced by TimedFunctionTools.
+
+    Other tools and toolsets are returned unchanged.
+    """
+    timed = []
+    for tool in tools:
+        if type(tool) is FunctionTool:
+            tool = TimedFunctionTool(
+                tool.func, timeout_seconds,
+                require_confirmation=tool._require_confirmation
+            )
+        elif callable(tool) and not isinstance(tool, BaseTool) and hasattr(tool, '__name__'):
+            tool = TimedFunctionTool(tool, timeout_seconds)
+        timed.append(tool)
+    return timed